@@ -0,0 +1,109 @@
+"""
+    Synthetic job documents for benchmarks.
+
+    Titles follow a Zipf-like distribution, so a few titles cover most jobs as in real
+    traffic. Each title family draws skills and responsibilities mostly from its own
+    pool, with some shared ones mixed in, so searches find neighbours above the score
+    threshold without every document looking the same.
+"""
+import random
+from services.models import IndexableJobDocument, SearchableJobDocument
+
+TITLE_FAMILIES = {
+    "Backend Engineer": (
+        ["python", "java", "go", "sql", "postgresql", "kafka", "docker", "kubernetes", "rest apis", "redis"],
+        ["design and build backend services", "own service reliability and on-call", "write and review code",
+         "design database schemas", "build internal apis", "improve service performance"],
+    ),
+    "Frontend Engineer": (
+        ["javascript", "typescript", "react", "css", "html", "webpack", "accessibility", "graphql"],
+        ["build user interfaces", "implement designs with product designers", "write and review code",
+         "improve page load performance", "maintain the component library"],
+    ),
+    "Data Analyst": (
+        ["sql", "excel", "tableau", "python", "statistics", "looker", "dashboards"],
+        ["build dashboards and reports", "analyse product metrics", "present findings to stakeholders",
+         "define kpis with business teams", "clean and validate data"],
+    ),
+    "Data Engineer": (
+        ["python", "sql", "spark", "airflow", "dbt", "kafka", "snowflake", "aws"],
+        ["build data pipelines", "maintain the data warehouse", "own data quality checks",
+         "model data for analytics", "optimise batch jobs"],
+    ),
+    "Product Manager": (
+        ["roadmapping", "user research", "analytics", "stakeholder management", "jira", "prioritisation"],
+        ["own the product roadmap", "write product requirements", "work with engineering and design",
+         "define success metrics", "run user interviews"],
+    ),
+    "Account Executive": (
+        ["negotiation", "salesforce", "prospecting", "closing", "crm", "communication"],
+        ["manage the sales pipeline", "close new business", "run product demos",
+         "negotiate contracts", "hit quarterly revenue targets"],
+    ),
+    "Marketing Manager": (
+        ["seo", "content marketing", "google analytics", "campaign management", "copywriting", "hubspot"],
+        ["plan marketing campaigns", "manage the content calendar", "track campaign performance",
+         "own the marketing budget", "work with sales on lead generation"],
+    ),
+    "Customer Support Specialist": (
+        ["zendesk", "communication", "troubleshooting", "empathy", "crm", "documentation"],
+        ["answer customer tickets", "escalate technical issues", "maintain help center articles",
+         "collect customer feedback", "meet response time targets"],
+    ),
+    "Financial Analyst": (
+        ["excel", "financial modeling", "forecasting", "sql", "accounting", "budgeting"],
+        ["build financial models", "prepare monthly forecasts", "analyse variances against budget",
+         "support the annual planning process", "report to finance leadership"],
+    ),
+    "DevOps Engineer": (
+        ["kubernetes", "terraform", "aws", "ci/cd", "linux", "docker", "prometheus", "bash"],
+        ["maintain cloud infrastructure", "build ci/cd pipelines", "own monitoring and alerting",
+         "automate deployments", "improve infrastructure security"],
+    ),
+}
+SHARED_SKILLS = ["communication", "teamwork", "problem solving", "english", "git", "agile"]
+SHARED_RESPONSIBILITIES = ["collaborate with cross-functional teams", "mentor junior colleagues", "document processes"]
+SENIORITIES = ["", "Senior ", "Lead ", "Junior "]
+SOURCES = ["human", "taxonomy", "gpt_verified", "vector_auto", "gpt_suggest"]
+
+class CorpusGenerator:
+    """Deterministic for a given seed, so runs against different code are comparable"""
+
+    def __init__(self, seed: int = 7, company_count: int = 200):
+        self.__rng = random.Random(seed)
+        self.__titles = list(TITLE_FAMILIES)
+        self.__title_weights = [1 / rank for rank in range(1, len(self.__titles) + 1)]
+        self.__companies = [f"company-{i}" for i in range(company_count)]
+
+    def indexable_documents(self, count: int) -> list[IndexableJobDocument]:
+        documents = []
+        for i in range(count):
+            fields = self.__document_fields()
+            title = fields["llm_primary_title"]
+            documents.append(IndexableJobDocument(
+                **fields,
+                job_id=f"bench-{i}",
+                selected_titles=[title, f"{self.__rng.choice(SENIORITIES)}{title}".strip()],
+                hop_level=self.__rng.choices([0, 1, 2], weights=[6, 3, 1])[0],
+                source=self.__rng.choice(SOURCES)
+            ))
+        return documents
+
+    def searchable_documents(self, count: int) -> list[SearchableJobDocument]:
+        return [SearchableJobDocument(**self.__document_fields()) for _ in range(count)]
+
+    def __document_fields(self) -> dict:
+        rng = self.__rng
+        title = rng.choices(self.__titles, weights=self.__title_weights)[0]
+        skills, responsibilities = TITLE_FAMILIES[title]
+        skill_names = rng.sample(skills, rng.randint(3, min(8, len(skills)))) + rng.sample(SHARED_SKILLS, rng.randint(0, 2))
+        job_responsibilities = rng.sample(responsibilities, rng.randint(2, len(responsibilities)))
+        job_responsibilities += rng.sample(SHARED_RESPONSIBILITIES, rng.randint(0, 1))
+        return {
+            "company_slug": rng.choice(self.__companies),
+            "llm_primary_title": title,
+            "llm_secondary_title": f"{rng.choice(SENIORITIES)}{title}".strip(),
+            "short_description": f"{title.lower()} working on {rng.choice(responsibilities)}",
+            "llm_responsibilities": job_responsibilities,
+            "llm_skills": [{"name": name} for name in skill_names],
+        }
@@ -0,0 +1,42 @@
+"""
+    Report cosine drift and throughput of an embedding backend against torch fp32.
+
+    python -m benchmarks.embedding_parity --backend onnx_int8 --count 1000
+"""
+import argparse
+import time
+import numpy as np
+from benchmarks.embedding_throughput import generate_texts
+from configs.configs import configs
+from storage.vectorizer import EMBEDDING_BACKENDS, load_model
+
+def encode(model, texts: list[str], batch_size: int) -> tuple[np.ndarray, float]:
+    model.encode(texts[:batch_size], batch_size=batch_size)  # warmup
+    start = time.perf_counter()
+    embeddings = model.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+    return embeddings, len(texts) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", choices=EMBEDDING_BACKENDS, default=configs.get_embedding_backend())
+    parser.add_argument("--threads", type=int, default=configs.get_embedding_threads())
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=configs.get_embedding_batch_size())
+    args = parser.parse_args()
+
+    model_name = configs.get_embedding_model_name()
+    texts = generate_texts(args.count)
+    reference, reference_rate = encode(load_model(model_name, "torch", args.threads), texts, args.batch_size)
+    candidate, candidate_rate = encode(load_model(model_name, args.backend, args.threads), texts, args.batch_size)
+
+    # rows are normalized, so the row-wise dot product is the cosine similarity
+    cosine = np.sum(reference * candidate, axis=1)
+    drift = 1.0 - cosine
+    print(f"backend        {args.backend} vs torch fp32 on {len(texts)} texts")
+    print(f"cosine         mean {cosine.mean():.5f}  min {cosine.min():.5f}")
+    print(f"drift (1-cos)  mean {drift.mean():.5f}  p99 {np.percentile(drift, 99):.5f}  max {drift.max():.5f}")
+    print(f"throughput     torch {reference_rate:.1f} texts/s, {args.backend} {candidate_rate:.1f} texts/s "
+          f"({candidate_rate / reference_rate:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+    Compare embedding throughput of the per-item path against Vectorizer.generate_embeddings.
+
+    python -m benchmarks.embedding_throughput --count 2000 --batch-size 64
+"""
+import argparse
+import random
+import time
+from storage.vectorizer import Vectorizer
+
+WORDS = [
+    "python", "kubernetes", "sql", "design", "customer", "sales", "analytics", "roadmap",
+    "backend", "frontend", "marketing", "finance", "hiring", "stakeholders", "testing",
+    "cloud", "security", "reporting", "operations", "negotiation", "strategy", "support",
+]
+
+def generate_texts(count: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        description = " ".join(rng.choices(WORDS, k=rng.randint(5, 25)))
+        skills = " ".join(sorted(set(rng.choices(WORDS, k=rng.randint(3, 15)))))
+        texts.append(f"short description: {description}, skills: {skills}")
+    return texts
+
+def measure(label: str, fn, texts: list[str]) -> float:
+    start = time.perf_counter()
+    fn(texts)
+    elapsed = time.perf_counter() - start
+    throughput = len(texts) / elapsed
+    print(f"{label:<10} {len(texts)} texts in {elapsed:.2f}s -> {throughput:.1f} texts/s")
+    return throughput
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    vectorizer = Vectorizer.get_instance()
+    vectorizer.cache = None # measure the model, not the embedding cache
+    texts = generate_texts(args.count)
+    vectorizer.generate_embeddings(texts[:32])  # warmup
+
+    per_item = measure("per-item", lambda items: [vectorizer.generate_embedding(t) for t in items], texts)
+    batched = measure("batched", lambda items: vectorizer.generate_embeddings(items, args.batch_size), texts)
+    print(f"speedup    {batched / per_item:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+    Measure embedding throughput of EmbeddingWorkerPool from 1 to N worker processes.
+
+    python -m benchmarks.embedding_workers --max-workers 8 --count 20000
+"""
+import argparse
+import os
+import time
+from benchmarks.embedding_throughput import generate_texts
+from configs.configs import configs
+from storage.embedding_pool import EmbeddingWorkerPool
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=configs.get_embedding_batch_size())
+    parser.add_argument("--no-share-weights", action="store_true")
+    args = parser.parse_args()
+
+    texts = generate_texts(args.count)
+    baseline = None
+    worker_count = 1
+    while worker_count <= args.max_workers:
+        pool = EmbeddingWorkerPool(
+            worker_count=worker_count,
+            model_name=configs.get_embedding_model_name(),
+            backend=configs.get_embedding_backend(),
+            share_weights=not args.no_share_weights
+        )
+        pool.encode(texts[:worker_count * args.batch_size], args.batch_size)  # warmup every worker
+        start = time.perf_counter()
+        pool.encode(texts, args.batch_size)
+        throughput = len(texts) / (time.perf_counter() - start)
+        pool.close()
+        baseline = baseline or throughput
+        print(f"{worker_count:>3} workers  {throughput:>9.1f} texts/s  {throughput / baseline:.2f}x")
+        worker_count *= 2
+
+if __name__ == "__main__":
+    main()
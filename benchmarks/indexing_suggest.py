@@ -0,0 +1,175 @@
+"""
+    End-to-end benchmark of embedding, indexing, upserts and suggest latency on a synthetic
+    corpus, run against an embedded Qdrant (in memory or on disk, no server needed).
+
+    python -m benchmarks.indexing_suggest --documents 5000 --queries 1000 --concurrency 16 --output results.json
+
+The embedding cache is disabled and every query is a distinct document, so numbers
+measure the model and the vector store rather than cache hit rates.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import time
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from benchmarks.corpus import CorpusGenerator
+from configs.configs import configs
+from services.suggestion_cache import SuggestionCache
+from services.vector_indexing_service import VectorIndexingService
+from services.vector_search_service import VectorSearchService
+from storage import vector_store
+from storage.vectorizer import Vectorizer
+
+UPSERT_COLLECTION_NAME = "bench_upsert"
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def latency_summary(latencies: list[float]) -> dict:
+    latencies_ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(latencies_ms.mean()), 3),
+        "max_ms": round(float(latencies_ms.max()), 3),
+    }
+
+def measure_embedding(vectorizer: Vectorizer, texts: list[str]) -> tuple[dict, list[list[float]]]:
+    start = time.perf_counter()
+    embeddings = vectorizer.generate_embeddings(texts)
+    elapsed = time.perf_counter() - start
+    return {
+        "texts": len(texts),
+        "seconds": round(elapsed, 3),
+        "texts_per_second": round(len(texts) / elapsed, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }, embeddings
+
+async def measure_indexing(client: AsyncQdrantClient, documents: list) -> dict:
+    service = VectorIndexingService(client)
+    start = time.perf_counter()
+    counts = await service.insert_documents(documents, incremental=False)
+    elapsed = time.perf_counter() - start
+    return {
+        "documents": len(documents),
+        "seconds": round(elapsed, 3),
+        "documents_per_second": round(len(documents) / elapsed, 1),
+        **counts,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+async def measure_upserts(client: AsyncQdrantClient, vectorizer: Vectorizer, texts: list[str], embeddings: list) -> dict:
+    """Write throughput alone, with vectors computed beforehand"""
+    await vector_store.create_collection_if_not_exists(client, vectorizer, UPSERT_COLLECTION_NAME)
+    items = [
+        vector_store.VectorItem(item_id=i, text=text, metadata={"text": text}, vector=embedding)
+        for i, (text, embedding) in enumerate(zip(texts, embeddings))
+    ]
+    start = time.perf_counter()
+    await vector_store.insert_items(client, UPSERT_COLLECTION_NAME, vectorizer, items)
+    elapsed = time.perf_counter() - start
+    await client.delete_collection(UPSERT_COLLECTION_NAME)
+    return {
+        "points": len(items),
+        "seconds": round(elapsed, 3),
+        "points_per_second": round(len(items) / elapsed, 1),
+        "chunk_size": configs.get_upsert_chunk_size(),
+        "max_in_flight": configs.get_upsert_max_in_flight(),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+async def measure_suggest(client: AsyncQdrantClient, queries: list, concurrency: int) -> dict:
+    service = VectorSearchService(client)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    suggestion_counts = []
+
+    async def suggest(document):
+        async with semaphore:
+            start = time.perf_counter()
+            suggestions = await service.search_items(document)
+            latencies.append(time.perf_counter() - start)
+            suggestion_counts.append(len(suggestions))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(suggest(document) for document in queries))
+    elapsed = time.perf_counter() - start
+    return {
+        "queries": len(queries),
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "queries_per_second": round(len(queries) / elapsed, 1),
+        **latency_summary(latencies),
+        "empty_suggestion_ratio": round(suggestion_counts.count(0) / len(suggestion_counts), 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+async def run(args) -> dict:
+    client = AsyncQdrantClient(path=args.qdrant_path) if args.qdrant_path else AsyncQdrantClient(location=":memory:")
+    vectorizer = Vectorizer.get_instance()
+    vectorizer.cache = None # measure the model, not the embedding cache
+    corpus = CorpusGenerator(seed=args.seed)
+    documents = corpus.indexable_documents(args.documents)
+    queries = corpus.searchable_documents(args.queries)
+    warmup_queries = corpus.searchable_documents(min(args.concurrency, args.queries))
+    await vector_store.create_configured_collections(client, vectorizer)
+
+    texts = [document._get_skills_vector_text() for document in documents]
+    texts += [document._get_responsibilities_vector_text() for document in documents]
+    vectorizer.generate_embeddings(texts[:32]) # warmup
+
+    results = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "settings": {
+            "documents": args.documents,
+            "queries": args.queries,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "qdrant": args.qdrant_path or ":memory:",
+            "storage_layout": configs.get_storage_layout(),
+            "embedding_model": configs.get_embedding_model_name(),
+            "embedding_backend": configs.get_embedding_backend(),
+            "embedding_batch_size": configs.get_embedding_batch_size(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+    }
+    results["embed"], embeddings = measure_embedding(vectorizer, texts)
+    results["upsert"] = await measure_upserts(client, vectorizer, texts, embeddings)
+    results["index"] = await measure_indexing(client, documents)
+    await measure_suggest(client, warmup_queries, args.concurrency)
+    results["suggest"] = await measure_suggest(client, queries, args.concurrency)
+    results["suggestion_cache"] = SuggestionCache.get_instance().get_stats()
+    results["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    await client.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--qdrant-path", default=None, help="on-disk embedded Qdrant directory, in memory when omitted")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+    embed, upsert, index, suggest = results["embed"], results["upsert"], results["index"], results["suggest"]
+    print(f"embed    {embed['texts_per_second']:>9.1f} texts/s")
+    print(f"upsert   {upsert['points_per_second']:>9.1f} points/s")
+    print(f"index    {index['documents_per_second']:>9.1f} documents/s")
+    print(f"suggest  {suggest['queries_per_second']:>9.1f} queries/s  "
+          f"p50 {suggest['p50_ms']:.1f}ms  p95 {suggest['p95_ms']:.1f}ms  p99 {suggest['p99_ms']:.1f}ms")
+    print(f"peak RSS {results['peak_rss_mb']:.1f} MB -> {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+    Compare the array-based suggestion merge with the per-result dict merge as top_k grows.
+
+    python -m benchmarks.suggestion_merge --top-k 5 50 200 1000 --repeat 20
+
+Both implementations run on the same synthetic search results, including the conversion
+from vector_store result dicts. Every run checks that their outputs are identical.
+Use the break-even point to tune ARRAY_MERGE_MIN_RESULTS in configs/configs.py.
+"""
+import argparse
+import json
+import random
+import time
+from benchmarks.corpus import SOURCES, TITLE_FAMILIES, SENIORITIES
+from services.models import SearchResult, SearchResultBatch
+from configs.configs import configs
+from services.suggestion_merge import merge_result_lists, merge_suggestions
+
+def generate_vector_results(count: int, rng: random.Random, title_count: int = 300) -> list[dict]:
+    families = list(TITLE_FAMILIES)
+    titles = [f"{seniority}{family} {i}".strip() for i in range(title_count // len(families) // len(SENIORITIES) + 1)
+              for family in families for seniority in SENIORITIES]
+    weights = [1 / rank for rank in range(1, len(titles) + 1)]
+    return [
+        {
+            "id": f"point-{i}",
+            "score": rng.uniform(0.8, 1.0),
+            "payload": {
+                "job_id": f"job-{rng.randrange(count * 2)}",
+                "titles": rng.choices(titles, weights=weights, k=rng.randint(1, 4)),
+                "hop_level": rng.choices([0, 1, 2, 3], weights=[5, 3, 2, 1])[0],
+                "source": rng.choice(SOURCES),
+            },
+        }
+        for i in range(count)
+    ]
+
+def dict_merge(skill_vector_results: list[dict], res_vector_results: list[dict]) -> list[dict]:
+    return merge_result_lists(
+        [SearchResult(res) for res in skill_vector_results],
+        [SearchResult(res) for res in res_vector_results]
+    )
+
+def array_merge(skill_vector_results: list[dict], res_vector_results: list[dict]) -> list[dict]:
+    vocabulary = {}
+    return merge_suggestions(
+        SearchResultBatch._from_vector_results(skill_vector_results, vocabulary),
+        SearchResultBatch._from_vector_results(res_vector_results, vocabulary)
+    )
+
+def measure(merge, pairs: list[tuple[list[dict], list[dict]]]) -> tuple[float, list]:
+    start = time.perf_counter()
+    outputs = [merge(skill_results, res_results) for skill_results, res_results in pairs]
+    return (time.perf_counter() - start) / len(pairs), outputs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, nargs="+", default=[5, 20, 50, 100, 200, 500, 1000])
+    parser.add_argument("--repeat", type=int, default=20, help="queries per top_k")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None, help="optional JSON file for the results")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = []
+    print(f"{'top_k':>6} {'dict ms':>10} {'array ms':>10} {'speedup':>8}  (array merge from {configs.get_array_merge_min_results()} results)")
+    for top_k in args.top_k:
+        pairs = [(generate_vector_results(top_k, rng), generate_vector_results(top_k, rng)) for _ in range(args.repeat)]
+        array_merge(*pairs[0]) # warmup
+        dict_seconds, dict_outputs = measure(dict_merge, pairs)
+        array_seconds, array_outputs = measure(array_merge, pairs)
+        if array_outputs != dict_outputs:
+            raise AssertionError(f"array merge output differs from the dict merge at top_k={top_k}")
+        rows.append({
+            "top_k": top_k,
+            "dict_ms": round(dict_seconds * 1000, 4),
+            "array_ms": round(array_seconds * 1000, 4),
+            "speedup": round(dict_seconds / array_seconds, 2),
+        })
+        print(f"{top_k:>6} {rows[-1]['dict_ms']:>10.3f} {rows[-1]['array_ms']:>10.3f} {rows[-1]['speedup']:>7.2f}x")
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(rows, output_file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,117 @@ import os
 
 class Configs:
     __QDRANT_URL: str
+    __QDRANT_MAX_CONNECTIONS: int
+    __QDRANT_MAX_KEEPALIVE_CONNECTIONS: int
+    __WARMUP_ON_STARTUP: bool
     __EMBEDDING_MODEL_NAME: str
     __SKILLS_COLLECTION_NAME: str
     __RESPONSIBILITIES_COLLECTION_NAME: str
+    __JOBS_COLLECTION_NAME: str
+    __VECTOR_BACKEND: str
+    __LOCAL_STORE_DTYPE: str
+    __LOCAL_STORE_SYNC_FROM_QDRANT: bool
+    __STORAGE_LAYOUT: str
+    __EMBEDDING_BACKEND: str
+    __EMBEDDING_THREADS: int | None
+    __EMBEDDING_ONNX_INT8_FILE: str
+    __EMBEDDING_WORKER_PROCESSES: int
+    __EMBEDDING_WORKER_SHARE_WEIGHTS: bool
+    __EMBEDDING_BATCH_SIZE: int
+    __EMBEDDING_POOL_SIZE: int
+    __EMBEDDING_CACHE_SIZE: int
+    __EMBEDDING_CACHE_TTL_SECONDS: float | None
+    __EMBEDDING_CACHE_MAX_ROWS: int | None
+    __INCREMENTAL_INDEXING: bool
+    __SUGGESTION_CACHE_SIZE: int
+    __SUGGESTION_CACHE_TTL_SECONDS: float | None
+    __SUGGESTION_CACHE_MAX_ROWS: int | None
+    __HNSW_M: int
+    __HNSW_EF_CONSTRUCT: int
+    __HNSW_EF_SEARCH: int | None
+    __HNSW_ON_DISK: bool
+    __VECTORS_ON_DISK: bool
+    __QUANTIZATION: str | None
+    __QUANTIZATION_ALWAYS_RAM: bool
+    __QUANTIZATION_RESCORE: bool
+    __QUANTIZATION_OVERSAMPLING: float
+    __OPTIMIZERS_CONFIG: dict
+    __PAYLOAD_INDEXES: dict
+    __SEARCH_TOP_K: int
+    __SEARCH_SCORE_THRESHOLD: float
+    __ARRAY_MERGE_MIN_RESULTS: int
+    __UPSERT_CHUNK_SIZE: int
+    __UPSERT_MAX_IN_FLIGHT: int
+    __UPSERT_WAIT: bool
+    __UPSERT_MAX_RETRIES: int
+    __UPSERT_RETRY_BACKOFF_SECONDS: float
+    __STREAM_INDEXING_BATCH_SIZE: int
+    __STREAM_PROGRESS_LOG_INTERVAL: int
+    __INDEXING_QUEUE_WORKERS: int
+    __INDEXING_QUEUE_MAX_SIZE: int
+    __INDEXING_QUEUE_COALESCE_SIZE: int
+    __INDEXING_JOB_HISTORY_SIZE: int
+    __LOG_SUGGESTIONS: bool
+    __PROFILER_ENABLED: bool
 
     def __init__(self):
+        self.__QDRANT_MAX_CONNECTIONS = 64 # http connection pool of the shared client
+        self.__QDRANT_MAX_KEEPALIVE_CONNECTIONS = 32
+        self.__WARMUP_ON_STARTUP = True # encode a few texts before reporting ready
         self.__SKILLS_COLLECTION_NAME = "desc_skills"
         self.__RESPONSIBILITIES_COLLECTION_NAME = "desc_res"
+        self.__JOBS_COLLECTION_NAME = "desc_jobs" # "skills" and "responsibilities" named vectors per point
+        self.__STORAGE_LAYOUT = "split" # split: desc_skills + desc_res, combined: desc_jobs
+        self.__VECTOR_BACKEND = "qdrant" # qdrant | local (in-process exact search)
+        self.__LOCAL_STORE_DTYPE = "float32" # float32 | float16
+        self.__LOCAL_STORE_SYNC_FROM_QDRANT = False
         self.__EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L12-v2" # 
+        self.__EMBEDDING_BACKEND = "torch" # torch | onnx | onnx_int8
+        self.__EMBEDDING_THREADS = None # intra-op threads, library default when None
+        self.__EMBEDDING_ONNX_INT8_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+        self.__EMBEDDING_WORKER_PROCESSES = 0 # 0 encodes in-process
+        self.__EMBEDDING_WORKER_SHARE_WEIGHTS = True
+        self.__EMBEDDING_BATCH_SIZE = 64
+        self.__EMBEDDING_POOL_SIZE = 2
+        self.__EMBEDDING_CACHE_SIZE = 50000 # 0 disables the cache
+        self.__EMBEDDING_CACHE_TTL_SECONDS = None
+        self.__EMBEDDING_CACHE_MAX_ROWS = 500000 # oldest rows of EMBEDDING_CACHE_PATH are evicted beyond this, None for no limit
+        self.__INCREMENTAL_INDEXING = True
+        self.__SUGGESTION_CACHE_SIZE = 10000 # 0 disables the cache
+        self.__SUGGESTION_CACHE_TTL_SECONDS = 3600
+        self.__SUGGESTION_CACHE_MAX_ROWS = 100000 # oldest rows of SUGGESTION_CACHE_PATH are evicted beyond this, None for no limit
+        self.__HNSW_M = 16
+        self.__HNSW_EF_CONSTRUCT = 100
+        self.__HNSW_EF_SEARCH = 128 # None uses the server default
+        self.__HNSW_ON_DISK = False
+        self.__VECTORS_ON_DISK = False # original vectors, quantized copies stay in RAM
+        self.__QUANTIZATION = None # None | int8 | binary
+        self.__QUANTIZATION_ALWAYS_RAM = True
+        self.__QUANTIZATION_RESCORE = True
+        self.__QUANTIZATION_OVERSAMPLING = 2.0
+        self.__OPTIMIZERS_CONFIG = {"indexing_threshold": 20000} # qdrant OptimizersConfigDiff fields
+        self.__PAYLOAD_INDEXES = { # payload field -> keyword | integer, used by search filters
+            "company_slug": "keyword",
+            "source": "keyword",
+            "hop_level": "integer",
+            "job_id": "keyword",
+        }
+        self.__SEARCH_TOP_K = 5 # results per vector search
+        self.__SEARCH_SCORE_THRESHOLD = 0.8
+        self.__ARRAY_MERGE_MIN_RESULTS = 100 # results per side from which suggestions merge on arrays, see benchmarks.suggestion_merge
+        self.__UPSERT_CHUNK_SIZE = 256
+        self.__UPSERT_MAX_IN_FLIGHT = 2
+        self.__UPSERT_WAIT = True
+        self.__UPSERT_MAX_RETRIES = 3
+        self.__UPSERT_RETRY_BACKOFF_SECONDS = 0.5
+        self.__STREAM_INDEXING_BATCH_SIZE = 1024
+        self.__STREAM_PROGRESS_LOG_INTERVAL = 10000
+        self.__INDEXING_QUEUE_WORKERS = 2
+        self.__INDEXING_QUEUE_MAX_SIZE = 1000 # queued submissions
+        self.__INDEXING_QUEUE_COALESCE_SIZE = 1024 # documents per coalesced batch
+        self.__INDEXING_JOB_HISTORY_SIZE = 10000
+        self.__LOG_SUGGESTIONS = False # log every suggest result at DEBUG level
+        self.__PROFILER_ENABLED = False # serves /debug/profile
         self.__load_dev_config()
 
     def __load_dev_config(self):
@@ -20,10 +123,150 @@ class Configs:
     
     def get_qdrant_url(self):
         return self.__QDRANT_URL
+
+    def get_qdrant_max_connections(self):
+        return self.__QDRANT_MAX_CONNECTIONS
+
+    def get_qdrant_max_keepalive_connections(self):
+        return self.__QDRANT_MAX_KEEPALIVE_CONNECTIONS
+
+    def is_warmup_on_startup_enabled(self):
+        return self.__WARMUP_ON_STARTUP
     
     def get_embedding_model_name(self):
         return self.__EMBEDDING_MODEL_NAME
 
+    def get_embedding_backend(self):
+        return self.__EMBEDDING_BACKEND
+
+    def get_embedding_threads(self):
+        return self.__EMBEDDING_THREADS
+
+    def get_embedding_onnx_int8_file(self):
+        return self.__EMBEDDING_ONNX_INT8_FILE
+
+    def get_embedding_worker_processes(self):
+        return self.__EMBEDDING_WORKER_PROCESSES
+
+    def is_embedding_worker_weight_sharing_enabled(self):
+        return self.__EMBEDDING_WORKER_SHARE_WEIGHTS
+
+    def get_embedding_batch_size(self):
+        return self.__EMBEDDING_BATCH_SIZE
+
+    def get_embedding_pool_size(self):
+        return self.__EMBEDDING_POOL_SIZE
+
+    def get_embedding_cache_size(self):
+        return self.__EMBEDDING_CACHE_SIZE
+
+    def get_embedding_cache_ttl_seconds(self):
+        return self.__EMBEDDING_CACHE_TTL_SECONDS
+
+    def get_embedding_cache_max_rows(self):
+        return self.__EMBEDDING_CACHE_MAX_ROWS
+
+    def get_embedding_cache_path(self):
+        """sqlite file for the persistent embedding cache tier, disabled when unset"""
+        return os.getenv("EMBEDDING_CACHE_PATH")
+
+    def is_incremental_indexing_enabled(self):
+        return self.__INCREMENTAL_INDEXING
+
+    def get_suggestion_cache_size(self):
+        return self.__SUGGESTION_CACHE_SIZE
+
+    def get_suggestion_cache_ttl_seconds(self):
+        return self.__SUGGESTION_CACHE_TTL_SECONDS
+
+    def get_suggestion_cache_max_rows(self):
+        return self.__SUGGESTION_CACHE_MAX_ROWS
+
+    def get_suggestion_cache_path(self):
+        """sqlite file shared by all workers for the suggestion cache, per-process only when unset"""
+        return os.getenv("SUGGESTION_CACHE_PATH")
+
+    def get_hnsw_m(self):
+        return self.__HNSW_M
+
+    def get_hnsw_ef_construct(self):
+        return self.__HNSW_EF_CONSTRUCT
+
+    def get_hnsw_ef_search(self):
+        return self.__HNSW_EF_SEARCH
+
+    def is_hnsw_on_disk(self):
+        return self.__HNSW_ON_DISK
+
+    def is_vectors_on_disk(self):
+        return self.__VECTORS_ON_DISK
+
+    def get_quantization(self):
+        return self.__QUANTIZATION
+
+    def is_quantization_always_ram(self):
+        return self.__QUANTIZATION_ALWAYS_RAM
+
+    def is_quantization_rescore_enabled(self):
+        return self.__QUANTIZATION_RESCORE
+
+    def get_quantization_oversampling(self):
+        return self.__QUANTIZATION_OVERSAMPLING
+
+    def get_optimizers_config(self):
+        return self.__OPTIMIZERS_CONFIG
+
+    def get_payload_indexes(self):
+        return self.__PAYLOAD_INDEXES
+
+    def get_search_top_k(self):
+        return self.__SEARCH_TOP_K
+
+    def get_search_score_threshold(self):
+        return self.__SEARCH_SCORE_THRESHOLD
+
+    def get_array_merge_min_results(self):
+        return self.__ARRAY_MERGE_MIN_RESULTS
+
+    def get_upsert_chunk_size(self):
+        return self.__UPSERT_CHUNK_SIZE
+
+    def get_upsert_max_in_flight(self):
+        return self.__UPSERT_MAX_IN_FLIGHT
+
+    def get_upsert_wait(self):
+        return self.__UPSERT_WAIT
+
+    def get_upsert_max_retries(self):
+        return self.__UPSERT_MAX_RETRIES
+
+    def get_upsert_retry_backoff_seconds(self):
+        return self.__UPSERT_RETRY_BACKOFF_SECONDS
+
+    def get_stream_indexing_batch_size(self):
+        return self.__STREAM_INDEXING_BATCH_SIZE
+
+    def get_stream_progress_log_interval(self):
+        return self.__STREAM_PROGRESS_LOG_INTERVAL
+
+    def get_indexing_queue_workers(self):
+        return self.__INDEXING_QUEUE_WORKERS
+
+    def get_indexing_queue_max_size(self):
+        return self.__INDEXING_QUEUE_MAX_SIZE
+
+    def get_indexing_queue_coalesce_size(self):
+        return self.__INDEXING_QUEUE_COALESCE_SIZE
+
+    def get_indexing_job_history_size(self):
+        return self.__INDEXING_JOB_HISTORY_SIZE
+
+    def is_suggestion_logging_enabled(self):
+        return self.__LOG_SUGGESTIONS
+
+    def is_profiler_enabled(self):
+        return self.__PROFILER_ENABLED
+
     def get_hugging_face_token(self):
         return os.getenv("HF_TOKEN")
     
@@ -33,4 +276,29 @@ class Configs:
     def get_responsibilities_collection_name(self):
         return self.__RESPONSIBILITIES_COLLECTION_NAME
 
+    def get_jobs_collection_name(self):
+        return self.__JOBS_COLLECTION_NAME
+
+    def get_vector_backend(self):
+        return self.__VECTOR_BACKEND
+
+    def is_local_vector_backend(self):
+        return self.__VECTOR_BACKEND == "local"
+
+    def get_local_store_dtype(self):
+        return self.__LOCAL_STORE_DTYPE
+
+    def get_local_store_path(self):
+        """Snapshot directory of the local backend, loaded at startup and written at shutdown"""
+        return os.getenv("LOCAL_STORE_PATH")
+
+    def is_local_store_sync_from_qdrant_enabled(self):
+        return self.__LOCAL_STORE_SYNC_FROM_QDRANT
+
+    def get_storage_layout(self):
+        return self.__STORAGE_LAYOUT
+
+    def is_combined_storage_layout(self):
+        return self.__STORAGE_LAYOUT == "combined"
+
 configs = Configs()
\ No newline at end of file
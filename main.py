@@ -1,13 +1,27 @@
-from fastapi import FastAPI
-from routes.index_routes import router as index_router
-from storage.vector_store import create_collection_if_not_exists
-from qdrant_client import QdrantClient
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse, PlainTextResponse
+from routes.index_routes import router as index_router, get_indexing_job_queue
+from storage import vector_store
+from storage.vector_store import create_configured_collections
+from qdrant_client import AsyncQdrantClient
 from configs.configs import configs
 from storage.vectorizer import Vectorizer
+from services.suggestion_cache import SuggestionCache
+from monitoring import metrics
+from monitoring.profiler import SamplingProfiler
+from monitoring.startup import startup_tracker
+import asyncio
 import logging
+import os
+import signal
 
 logging.basicConfig(level=logging.INFO)
 
+WARMUP_TEXTS = [
+    "short description: warmup, skills: python sql",
+    "short description: warmup, responsibilities: build and maintain services",
+]
+
 
 # Create FastAPI app instance
 app = FastAPI(
@@ -28,25 +42,80 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "message": "API is running"}
+    """Health check endpoint, 503 until the model is loaded and the collections exist"""
+    startup = startup_tracker.get_status()
+    if not startup["ready"]:
+        status = "failed" if startup["error"] else "starting"
+        return JSONResponse(status_code=503, content={"status": status, "message": "API is not ready", "startup": startup})
+    return {"status": "healthy", "message": "API is running", "startup": startup}
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    content, content_type = metrics.render_latest()
+    return Response(content=content, media_type=content_type)
+
+if configs.is_profiler_enabled():
+    @app.get("/debug/profile")
+    async def profile(seconds: float = 10.0):
+        """Samples all threads for `seconds` and returns collapsed stacks"""
+        profiler = SamplingProfiler()
+        profiler.start()
+        await asyncio.sleep(min(seconds, 60.0))
+        return PlainTextResponse(profiler.stop())
 
 @app.on_event("startup")
 async def startup_event():
-    logging.error(f"Creating collections if they do not exist...: {configs.get_qdrant_url()}")
-    client = QdrantClient(configs.get_qdrant_url())
-    vectorizer = Vectorizer.get_instance()
-    create_collection_if_not_exists(
-        client = client,
-        vectorizer = vectorizer,
-        collection_name = configs.get_skills_collection_name()
-    )
-    create_collection_if_not_exists(
-        client = client,
-        vectorizer = vectorizer,
-        collection_name = configs.get_responsibilities_collection_name()
-    )
-    logging.info("Collections are ready.")
+    # the server accepts connections right away, /health reports when warm_up is done
+    app.state.warm_up_task = asyncio.create_task(warm_up())
+
+async def warm_up():
+    try:
+        client = vector_store.get_shared_client()
+        with startup_tracker.stage("model_load"):
+            # loading runs in a thread so /health keeps answering
+            vectorizer = await asyncio.to_thread(Vectorizer.get_instance)
+        if configs.is_warmup_on_startup_enabled():
+            with startup_tracker.stage("warmup_encode"):
+                await asyncio.to_thread(vectorizer.generate_embeddings_array, WARMUP_TEXTS)
+        if configs.is_local_vector_backend():
+            with startup_tracker.stage("local_store_load"):
+                await load_local_store()
+        with startup_tracker.stage("collections"):
+            logging.info(f"Creating collections if they do not exist: {configs.get_qdrant_url()}")
+            await create_configured_collections(client, vectorizer)
+        indexing_job_queue = get_indexing_job_queue()
+        await indexing_job_queue.start()
+        metrics.register_stats_source("embedding_cache", vectorizer.get_cache_stats)
+        metrics.register_stats_source("suggestion_cache", SuggestionCache.get_instance().get_stats)
+        metrics.register_stats_source("indexing_queue", indexing_job_queue.get_stats)
+        startup_tracker.mark_ready()
+    except Exception as error:
+        logging.exception("Startup failed, shutting down")
+        startup_tracker.mark_failed(error)
+        # stop uvicorn like a failed startup event would, so the service manager restarts it
+        signal.raise_signal(signal.SIGTERM)
+
+async def load_local_store():
+    local_store = vector_store.get_local_store()
+    snapshot_path = configs.get_local_store_path()
+    if snapshot_path and os.path.isdir(snapshot_path):
+        local_store.load(snapshot_path) # type: ignore
+    if configs.is_local_store_sync_from_qdrant_enabled():
+        qdrant_client = AsyncQdrantClient(configs.get_qdrant_url())
+        for collection_name in vector_store.get_configured_collection_names():
+            await local_store.sync_from_qdrant(qdrant_client, collection_name) # type: ignore
+        await qdrant_client.close()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.warm_up_task.cancel()
+    if startup_tracker.is_ready():
+        await get_indexing_job_queue().stop()
+        # only after a complete startup, a half-loaded local store must not replace the snapshot
+        if configs.is_local_vector_backend() and configs.get_local_store_path():
+            vector_store.get_local_store().snapshot(configs.get_local_store_path()) # type: ignore
+    await vector_store.close_shared_client()
 
 if __name__ == "__main__":
     pass
@@ -0,0 +1,75 @@
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+from typing import Callable
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STAGE_SECONDS = Histogram(
+    "titlevectors_stage_seconds",
+    "Time spent in each hot-path stage",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+ENCODE_BATCH_SIZE = Histogram(
+    "titlevectors_encode_batch_size",
+    "Texts per encode call after cache lookups",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+)
+QDRANT_CALL_SECONDS = Histogram(
+    "titlevectors_qdrant_call_seconds",
+    "Latency of each vector store call",
+    ["operation", "collection"],
+    buckets=LATENCY_BUCKETS
+)
+POINTS_UPSERTED = Counter(
+    "titlevectors_points_upserted_total",
+    "Points written to the vector store",
+    ["collection"]
+)
+PAYLOADS_UPDATED = Counter(
+    "titlevectors_payloads_updated_total",
+    "Points whose payload was updated without re-embedding",
+    ["collection"]
+)
+SEARCH_RESULTS = Histogram(
+    "titlevectors_search_result_count",
+    "Points returned per vector search",
+    ["vector"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+)
+SUGGESTIONS = Histogram(
+    "titlevectors_suggestion_count",
+    "Merged suggestions returned per document",
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50)
+)
+EMPTY_SUGGESTIONS = Counter(
+    "titlevectors_empty_suggestions_total",
+    "Documents without suggestions, by reason",
+    ["reason"]
+)
+
+class _StatsCollector:
+    """Exposes dict-returning stats callbacks (cache counters, queue sizes) as gauges"""
+
+    def __init__(self):
+        self.__sources: dict[str, Callable[[], dict]] = {}
+
+    def add_source(self, name: str, get_stats: Callable[[], dict]):
+        self.__sources[name] = get_stats
+
+    def collect(self):
+        gauge = GaugeMetricFamily("titlevectors_component_stat", "Counters reported by internal components", labels=["component", "stat"])
+        for name, get_stats in self.__sources.items():
+            for stat, value in get_stats().items():
+                if isinstance(value, (int, float)):
+                    gauge.add_metric([name, stat], value)
+        yield gauge
+
+_stats_collector = _StatsCollector()
+REGISTRY.register(_stats_collector) # type: ignore
+
+def register_stats_source(name: str, get_stats: Callable[[], dict]):
+    _stats_collector.add_source(name, get_stats)
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(), CONTENT_TYPE_LATEST
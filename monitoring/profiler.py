@@ -0,0 +1,45 @@
+import sys
+import threading
+import time
+from collections import Counter
+
+class SamplingProfiler:
+    """
+        Samples the stacks of every thread at a fixed interval while running.
+        Results are collapsed stacks ("frame;frame;frame count" lines) that flamegraph.pl
+        and speedscope can render. Costs nothing until `start` is called.
+    """
+
+    def __init__(self, interval_seconds: float = 0.005):
+        self.__interval_seconds = interval_seconds
+        self.__stacks: Counter = Counter()
+        self.__stop = threading.Event()
+        self.__thread: threading.Thread | None = None
+
+    def start(self):
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__run, name="sampling-profiler", daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> str:
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+        return "\n".join(f"{stack} {count}" for stack, count in self.__stacks.most_common())
+
+    def __run(self):
+        own_thread_id = threading.get_ident()
+        while not self.__stop.is_set():
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread_id:
+                    continue
+                self.__stacks[self.__collapse(frame)] += 1
+            time.sleep(self.__interval_seconds)
+
+    def __collapse(self, frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
@@ -0,0 +1,45 @@
+from contextlib import contextmanager
+import logging
+import time
+
+class StartupTracker:
+    """
+        Wall time of each startup stage, and whether the app is ready for traffic.
+        /health reports this so readiness probes hold traffic until the model is loaded.
+    """
+
+    def __init__(self):
+        self.__started_at = time.perf_counter()
+        self.__stage_seconds: dict[str, float] = {}
+        self.__ready_after_seconds: float | None = None
+        self.__error: str | None = None
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.__stage_seconds[name] = round(time.perf_counter() - start, 3)
+            logging.info(f"Startup stage '{name}' took {self.__stage_seconds[name]:.2f}s")
+
+    def mark_ready(self):
+        self.__ready_after_seconds = round(time.perf_counter() - self.__started_at, 3)
+        breakdown = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in self.__stage_seconds.items())
+        logging.info(f"Ready after {self.__ready_after_seconds:.2f}s ({breakdown})")
+
+    def mark_failed(self, error: Exception):
+        self.__error = f"{type(error).__name__}: {error}"
+
+    def is_ready(self) -> bool:
+        return self.__ready_after_seconds is not None
+
+    def get_status(self) -> dict:
+        return {
+            "ready": self.is_ready(),
+            "error": self.__error,
+            "ready_after_seconds": self.__ready_after_seconds,
+            "stages": dict(self.__stage_seconds),
+        }
+
+startup_tracker = StartupTracker()
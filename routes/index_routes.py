@@ -1,43 +1,176 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import JSONResponse
 from services.vector_search_service import VectorSearchService
 from services.vector_indexing_service import VectorIndexingService
-from services.models import IndexableJobDocument, SearchableJobDocument
+from services.indexing_job_queue import IndexingJobQueue
+from services.suggestion_cache import SuggestionCache
+from services.models import IndexableJobDocument, SearchableJobDocument, SearchFilters
+from storage.vectorizer import Vectorizer
+from configs.configs import configs
+from monitoring.startup import startup_tracker
+from typing import AsyncIterator
+import asyncio
+import json
 import logging
 
-router = APIRouter()
+def _ensure_ready():
+    # building a service before startup finishes would load the model on the event loop
+    if not startup_tracker.is_ready():
+        raise HTTPException(status_code=503, detail="Service is starting")
+
+router = APIRouter(dependencies=[Depends(_ensure_ready)])
+
+# built on first use, so importing the routes neither loads the model nor opens connections
+_vector_indexing_service: VectorIndexingService | None = None
+_vector_search_service: VectorSearchService | None = None
+_indexing_job_queue: IndexingJobQueue | None = None
+
+def get_vector_indexing_service() -> VectorIndexingService:
+    global _vector_indexing_service
+    if _vector_indexing_service is None:
+        _vector_indexing_service = VectorIndexingService()
+    return _vector_indexing_service
+
+def get_vector_search_service() -> VectorSearchService:
+    global _vector_search_service
+    if _vector_search_service is None:
+        _vector_search_service = VectorSearchService()
+    return _vector_search_service
+
+def get_indexing_job_queue() -> IndexingJobQueue:
+    global _indexing_job_queue
+    if _indexing_job_queue is None:
+        _indexing_job_queue = IndexingJobQueue(get_vector_indexing_service())
+    return _indexing_job_queue
 
-vector_indexing_service = VectorIndexingService()
-vector_search_service = VectorSearchService()
 
 @router.post("/api/index")
 async def indexing_api(request: Request):
     json_data = await request.json()
     jobs = json_data['jobs']
-    documents = []
-    for job in jobs:
-        documents.append(
-            IndexableJobDocument(
-                job_id=job["job_id"],
-                company_slug=job["company_slug"],
-                llm_primary_title=job["llm_primary_title"],
-                llm_secondary_title=job["llm_secondary_title"],
-                short_description=job["short_description"],
-                llm_responsibilities=job["llm_responsibilities"],
-                llm_skills=job["llm_skills"],
-                selected_titles=job["selected_titles"],
-                hop_level=job["hop_level"],
-                source=job["source"]
-            )
-        )
-    vector_indexing_service.insert_documents(documents)
-    return JSONResponse(content={"success": True})
+    documents = [_to_indexable_document(job) for job in jobs]
+    counts = await get_vector_indexing_service().insert_documents(documents, incremental=json_data.get("incremental"))
+    return JSONResponse(content={"success": True, **counts})
+
+
+@router.post("/api/index_stream")
+async def streaming_indexing_api(request: Request):
+    """Index newline-delimited JSON jobs as they arrive, one job object per line"""
+    incremental = request.query_params.get("incremental")
+    invalid_lines = []
+    counts = await get_vector_indexing_service().insert_document_stream(
+        _read_ndjson_documents(request, invalid_lines),
+        incremental=None if incremental is None else incremental.lower() == "true"
+    )
+    return JSONResponse(content={
+        "success": True,
+        **counts,
+        "invalid": len(invalid_lines),
+        "invalid_lines": invalid_lines[:100]
+    })
+
+
+@router.post("/api/index_jobs")
+async def submit_indexing_job_api(request: Request):
+    """Queue jobs for background indexing and return a job id right away"""
+    json_data = await request.json()
+    documents = [_to_indexable_document(job) for job in json_data['jobs']]
+    try:
+        job = get_indexing_job_queue().submit(documents, incremental=json_data.get("incremental"))
+    except asyncio.QueueFull:
+        return JSONResponse(status_code=503, content={"success": False, "message": "Indexing queue is full"})
+    return JSONResponse(status_code=202, content={"success": True, "job_id": job.job_id, "status": job.status})
+
+
+@router.get("/api/index_jobs/{job_id}")
+async def indexing_job_status_api(job_id: str):
+    job = get_indexing_job_queue().get_job(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"success": False, "message": "Unknown job id"})
+    return JSONResponse(content=job._to_status())
+
+
+@router.get("/api/index_jobs")
+async def indexing_queue_stats_api():
+    return JSONResponse(content=get_indexing_job_queue().get_stats())
 
 
 @router.post("/api/suggest")
 async def suggestions_api(request: Request):
     json_data = await request.json()
-    document = SearchableJobDocument(
+    document = _to_searchable_document(json_data)
+    filters = _to_search_filters(json_data.get("filters"))
+    suggestions = await get_vector_search_service().search_items(document, filters)
+    # formatting every suggestion list is costly on the hot path, so this stays opt-in
+    if configs.is_suggestion_logging_enabled() and logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug("Suggestions: %s", suggestions)
+    return JSONResponse(content=suggestions)
+
+
+@router.post("/api/suggest_batch")
+async def batch_suggestions_api(request: Request):
+    json_data = await request.json()
+    documents = [_to_searchable_document(doc) for doc in json_data["documents"]]
+    filters = _to_search_filters(json_data.get("filters"))
+    suggestions = await get_vector_search_service().search_items_batch(documents, filters)
+    return JSONResponse(content={"suggestions": suggestions})
+
+
+@router.get("/api/embedding_cache/stats")
+async def embedding_cache_stats_api():
+    return JSONResponse(content=Vectorizer.get_instance().get_cache_stats())
+
+
+@router.get("/api/suggestion_cache/stats")
+async def suggestion_cache_stats_api():
+    return JSONResponse(content=SuggestionCache.get_instance().get_stats())
+
+
+async def _read_ndjson_documents(request: Request, invalid_lines: list[int]) -> AsyncIterator[IndexableJobDocument]:
+    buffer = b""
+    line_number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            document = _parse_ndjson_line(line, line_number, invalid_lines)
+            if document is not None:
+                yield document
+    if buffer.strip():
+        document = _parse_ndjson_line(buffer, line_number + 1, invalid_lines)
+        if document is not None:
+            yield document
+
+
+def _parse_ndjson_line(line: bytes, line_number: int, invalid_lines: list[int]) -> IndexableJobDocument | None:
+    if not line.strip():
+        return None
+    try:
+        return _to_indexable_document(json.loads(line))
+    except (ValueError, KeyError, TypeError) as error:
+        logging.warning(f"Skipping invalid NDJSON line {line_number}: {error}")
+        invalid_lines.append(line_number)
+        return None
+
+
+def _to_indexable_document(job: dict) -> IndexableJobDocument:
+    return IndexableJobDocument(
+        job_id=job["job_id"],
+        company_slug=job["company_slug"],
+        llm_primary_title=job["llm_primary_title"],
+        llm_secondary_title=job["llm_secondary_title"],
+        short_description=job["short_description"],
+        llm_responsibilities=job["llm_responsibilities"],
+        llm_skills=job["llm_skills"],
+        selected_titles=job["selected_titles"],
+        hop_level=job["hop_level"],
+        source=job["source"]
+    )
+
+
+def _to_searchable_document(json_data: dict) -> SearchableJobDocument:
+    return SearchableJobDocument(
         company_slug=json_data["company_slug"],
         llm_primary_title=json_data["llm_primary_title"],
         llm_secondary_title=json_data["llm_secondary_title"],
@@ -45,6 +178,31 @@ async def suggestions_api(request: Request):
         llm_responsibilities=json_data["llm_responsibilities"],
         llm_skills=json_data["llm_skills"],
     )
-    suggestions = vector_search_service.search_items(document)
-    logging.info(f"Suggestions: {suggestions}")
-    return JSONResponse(content=suggestions)
\ No newline at end of file
+
+
+def _to_search_filters(filters) -> SearchFilters | None:
+    """Invalid filters are rejected with 400, a bad filter must not silently change results"""
+    if not filters:
+        return None
+    if not isinstance(filters, dict):
+        raise HTTPException(status_code=400, detail="'filters' must be an object")
+    max_hop_level = filters.get("max_hop_level")
+    if max_hop_level is not None and (not isinstance(max_hop_level, int) or isinstance(max_hop_level, bool)):
+        raise HTTPException(status_code=400, detail="'filters.max_hop_level' must be an integer")
+    return SearchFilters(
+        sources=_to_string_list(filters, "sources"),
+        max_hop_level=max_hop_level,
+        exclude_company_slugs=_to_string_list(filters, "exclude_company_slugs")
+    )
+
+
+def _to_string_list(filters: dict, key: str) -> list[str] | None:
+    values = filters.get(key)
+    if values is None:
+        return None
+    # a single value is accepted as a one-element list
+    if isinstance(values, str):
+        return [values]
+    if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+        raise HTTPException(status_code=400, detail=f"'filters.{key}' must be a string or a list of strings")
+    return values
@@ -0,0 +1,22 @@
+"""
+    Create the collections or apply the tuning in configs/configs.py to existing ones,
+    without restarting the API. Safe to run repeatedly.
+
+    python -m scripts.apply_collection_config
+"""
+from qdrant_client import AsyncQdrantClient
+from configs.configs import configs
+from storage.vectorizer import Vectorizer
+from storage.vector_store import create_configured_collections
+import asyncio
+import logging
+
+async def main():
+    client = AsyncQdrantClient(configs.get_qdrant_url())
+    vectorizer = Vectorizer.get_instance()
+    await create_configured_collections(client, vectorizer)
+    await client.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+    Merge the split desc_skills/desc_res collections into the combined named-vector collection.
+
+    Scrolls the skills collection page by page, fetches the matching responsibilities
+    points by id and upserts one point per job with both vectors. Existing vectors are
+    copied as they are, nothing is re-embedded. Set STORAGE_LAYOUT to "combined" once it finishes.
+
+    python -m scripts.merge_collections --page-size 512
+"""
+from qdrant_client import AsyncQdrantClient
+from configs.configs import configs
+from storage.vectorizer import Vectorizer
+from storage import vector_store
+import argparse
+import asyncio
+import logging
+import time
+
+async def merge_collections(client: AsyncQdrantClient, page_size: int) -> dict:
+    skills_collection = configs.get_skills_collection_name()
+    res_collection = configs.get_responsibilities_collection_name()
+    jobs_collection = configs.get_jobs_collection_name()
+    await vector_store.create_collection_if_not_exists(
+        client = client,
+        vectorizer = Vectorizer.get_instance(),
+        collection_name = jobs_collection,
+        vector_names = (vector_store.SKILLS_VECTOR_NAME, vector_store.RESPONSIBILITIES_VECTOR_NAME)
+    )
+
+    pipeline = vector_store.UpsertPipeline(client)
+    counts = {"merged": 0, "missing_responsibilities": 0}
+    started_at = time.perf_counter()
+    offset = None
+    while True:
+        skill_points, offset = await client.scroll(
+            collection_name=skills_collection,
+            limit=page_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True
+        )
+        res_points = await client.retrieve(
+            collection_name=res_collection,
+            ids=[point.id for point in skill_points],
+            with_payload=False,
+            with_vectors=True
+        )
+        res_vectors = {str(point.id): point.vector["default"] for point in res_points} # type: ignore
+
+        merged_points = []
+        for point in skill_points:
+            res_vector = res_vectors.get(str(point.id))
+            if res_vector is None:
+                counts["missing_responsibilities"] += 1
+                continue
+            merged_points.append(vector_store.to_combined_point(
+                vector_store.VectorItem(str(point.id), "", point.payload or {}, point.vector["default"]), # type: ignore
+                vector_store.VectorItem(str(point.id), "", {}, res_vector)
+            ))
+        await pipeline.submit(jobs_collection, merged_points)
+        counts["merged"] += len(merged_points)
+        logging.info(f"Merged {counts['merged']} points ({counts['merged'] / (time.perf_counter() - started_at):.1f}/s)")
+        if offset is None:
+            break
+
+    await pipeline.drain()
+    return counts
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page-size", type=int, default=512)
+    args = parser.parse_args()
+
+    client = AsyncQdrantClient(configs.get_qdrant_url())
+    counts = await merge_collections(client, args.page_size)
+    await client.close()
+    logging.info(f"Done: {counts}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,211 @@
+"""
+    Re-embed every indexed job into a new versioned collection and switch the alias to it.
+
+    Points are streamed from the live collections with `scroll`. Documents are rebuilt
+    from their payload with the current vector text format and re-embedded in large
+    batches with the configured EMBEDDING_MODEL_NAME. They are written to
+    `<collection>_<version>`, and the collection name is then repointed as an alias in one
+    atomic alias update. Progress is checkpointed after every page, so an interrupted run
+    resumes where it stopped when started again with the same arguments.
+
+    Points indexed before payloads carried source fields cannot be re-embedded. By default
+    the aliases are not switched (and nothing is deleted) while any were skipped; pass
+    --copy-legacy-vectors to carry them over with their existing vectors, or
+    --allow-skipped to drop them.
+
+    python -m scripts.reindex --version v2 --page-size 1024
+"""
+from qdrant_client import AsyncQdrantClient, models
+from configs.configs import configs
+from services.models import IndexableJobDocument
+from services.vector_indexing_service import VectorIndexingService
+from storage.vectorizer import Vectorizer
+from storage import vector_store
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+def load_checkpoint(path: str, version: str) -> dict:
+    if not os.path.exists(path):
+        return {"version": version, "offset": None, "done": False, "counts": {"reindexed": 0, "copied": 0, "skipped": 0}}
+    with open(path) as checkpoint_file:
+        checkpoint = json.load(checkpoint_file)
+    if checkpoint["version"] != version:
+        raise SystemExit(f"Checkpoint {path} belongs to version {checkpoint['version']}, not {version}")
+    return checkpoint
+
+def save_checkpoint(path: str, checkpoint: dict):
+    # write then rename so a crash never leaves a truncated checkpoint
+    with open(f"{path}.tmp", "w") as checkpoint_file:
+        json.dump(checkpoint, checkpoint_file)
+    os.replace(f"{path}.tmp", path)
+
+async def copy_legacy_points(client: AsyncQdrantClient, points: list, version: str, vector_size: int):
+    """
+        Copy points without source fields to the versioned collections as they are. Their
+        vectors come from the old model, so this only makes sense if a later reindex or
+        re-submission of those jobs is planned.
+    """
+    if len(points) == 0:
+        return
+    for point in points:
+        vectors = point.vector if isinstance(point.vector, dict) else {"default": point.vector}
+        if any(len(vector) != vector_size for vector in vectors.values()):
+            raise SystemExit(
+                f"Point {point.id} has vectors of a different size than the new model ({vector_size}); "
+                f"legacy points cannot be copied. Use --allow-skipped to drop them instead."
+            )
+    pipeline = vector_store.UpsertPipeline(client)
+    if configs.is_combined_storage_layout():
+        await pipeline.submit(
+            f"{configs.get_jobs_collection_name()}_{version}",
+            [models.PointStruct(id=point.id, vector=point.vector, payload=point.payload) for point in points]
+        )
+    else:
+        # the page comes from the skills collection, responsibilities points share its ids
+        res_points = await client.retrieve(
+            collection_name=configs.get_responsibilities_collection_name(),
+            ids=[point.id for point in points],
+            with_payload=True,
+            with_vectors=True
+        )
+        await pipeline.submit(
+            f"{configs.get_skills_collection_name()}_{version}",
+            [models.PointStruct(id=point.id, vector=point.vector, payload=point.payload) for point in points]
+        )
+        await pipeline.submit(
+            f"{configs.get_responsibilities_collection_name()}_{version}",
+            [models.PointStruct(id=point.id, vector=point.vector, payload=point.payload) for point in res_points]
+        )
+    await pipeline.drain()
+
+async def create_target_collections(client: AsyncQdrantClient, vectorizer: Vectorizer, version: str):
+    vector_names = ("default",)
+    if configs.is_combined_storage_layout():
+        vector_names = (vector_store.SKILLS_VECTOR_NAME, vector_store.RESPONSIBILITIES_VECTOR_NAME)
+    for collection_name in vector_store.get_configured_collection_names():
+        await vector_store.create_collection_if_not_exists(
+            client = client,
+            vectorizer = vectorizer,
+            collection_name = f"{collection_name}_{version}",
+            vector_names = vector_names
+        )
+
+async def switch_aliases(client: AsyncQdrantClient, version: str, replace_collection: bool):
+    """Point every collection name at its versioned collection in a single alias update"""
+    collections = {col.name for col in (await client.get_collections()).collections}
+    aliases = {alias.alias_name for alias in (await client.get_aliases()).aliases}
+    operations = []
+    for alias_name in vector_store.get_configured_collection_names():
+        if alias_name in collections:
+            if not replace_collection:
+                raise SystemExit(
+                    f"'{alias_name}' is a collection, not an alias. Re-run with --replace-collection "
+                    f"to delete it and create the alias (reads fail briefly while it is swapped)."
+                )
+            logging.warning(f"Deleting collection '{alias_name}' to replace it with an alias")
+            await client.delete_collection(alias_name)
+        if alias_name in aliases:
+            operations.append(models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=alias_name)))
+        operations.append(models.CreateAliasOperation(create_alias=models.CreateAlias(
+            collection_name=f"{alias_name}_{version}",
+            alias_name=alias_name
+        )))
+    await client.update_collection_aliases(change_aliases_operations=operations)
+    logging.info(f"Aliases now point to version {version}: {vector_store.get_configured_collection_names()}")
+
+async def reindex(
+        version: str,
+        page_size: int,
+        checkpoint_path: str,
+        replace_collection: bool,
+        copy_legacy_vectors: bool = False,
+        allow_skipped: bool = False):
+    client = AsyncQdrantClient(configs.get_qdrant_url())
+    vectorizer = Vectorizer.get_instance()
+    checkpoint = load_checkpoint(checkpoint_path, version)
+    await create_target_collections(client, vectorizer, version)
+    indexing_service = VectorIndexingService(client, collection_suffix=version)
+    vector_size = vectorizer.get_vector_config().size
+
+    # every collection of a layout carries the same payload, so one of them is enough
+    source_collection = vector_store.get_configured_collection_names()[0]
+    counts = checkpoint["counts"]
+    started_at = time.perf_counter()
+    processed_this_run = 0
+    while not checkpoint["done"]:
+        points, next_offset = await client.scroll(
+            collection_name=source_collection,
+            limit=page_size,
+            offset=checkpoint["offset"],
+            with_payload=True,
+            with_vectors=copy_legacy_vectors
+        )
+        documents = []
+        legacy_points = []
+        for point in points:
+            try:
+                documents.append(IndexableJobDocument._from_payload(point.payload or {}))
+            except KeyError:
+                legacy_points.append(point)
+        await indexing_service.insert_documents(documents, incremental=False)
+        if copy_legacy_vectors:
+            await copy_legacy_points(client, legacy_points, version, vector_size)
+            counts["copied"] = counts.get("copied", 0) + len(legacy_points)
+        else:
+            counts["skipped"] += len(legacy_points)
+
+        counts["reindexed"] += len(documents)
+        processed_this_run += len(points)
+        checkpoint["offset"] = next_offset
+        checkpoint["done"] = next_offset is None
+        save_checkpoint(checkpoint_path, checkpoint)
+        elapsed = time.perf_counter() - started_at
+        logging.info(
+            f"Reindexed {counts['reindexed']} documents, copied {counts.get('copied', 0)} and skipped "
+            f"{counts['skipped']} without source fields, "
+            f"{processed_this_run / elapsed:.1f} points/s"
+        )
+
+    if counts["skipped"] > 0 and not allow_skipped:
+        await client.close()
+        # the live collections still hold these points, so nothing is switched or deleted
+        raise SystemExit(
+            f"{counts['skipped']} points have no source fields and were not reindexed. Aliases were not "
+            f"switched. Re-run with --copy-legacy-vectors and a new --version to carry them over, or "
+            f"with --allow-skipped to switch without them."
+        )
+    await switch_aliases(client, version, replace_collection)
+    await client.close()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--version", required=True, help="suffix of the new collections, e.g. v2")
+    parser.add_argument("--page-size", type=int, default=1024)
+    parser.add_argument("--checkpoint", default=None, help="defaults to reindex_<version>.checkpoint.json")
+    parser.add_argument("--replace-collection", action="store_true",
+                        help="delete live collections that are not aliases yet (first migration only)")
+    parser.add_argument("--copy-legacy-vectors", action="store_true",
+                        help="copy points without source fields with their existing vectors")
+    parser.add_argument("--allow-skipped", action="store_true",
+                        help="switch aliases even if points without source fields were dropped")
+    args = parser.parse_args()
+
+    checkpoint_path = args.checkpoint or f"reindex_{args.version}.checkpoint.json"
+    counts = asyncio.run(reindex(
+        args.version,
+        args.page_size,
+        checkpoint_path,
+        args.replace_collection,
+        copy_legacy_vectors=args.copy_legacy_vectors,
+        allow_skipped=args.allow_skipped
+    ))
+    logging.info(f"Done: {counts}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
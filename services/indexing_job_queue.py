@@ -0,0 +1,144 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from services.models import IndexableJobDocument
+from services.vector_indexing_service import VectorIndexingService
+from configs.configs import configs
+import asyncio
+import logging
+import time
+import uuid
+
+@dataclass
+class IndexingJob:
+    job_id: str
+    documents: list[IndexableJobDocument]
+    incremental: bool | None
+    status: str = "queued" # queued -> running -> done | failed
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    document_count: int = 0
+    batch_counts: dict = field(default_factory=dict)
+    coalesced_jobs: int = 0
+    error: str | None = None
+
+    def _to_status(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "documents": self.document_count,
+            # counts are for the coalesced batch this job was indexed in
+            "batch_counts": self.batch_counts,
+            "coalesced_jobs": self.coalesced_jobs,
+            "queued_seconds": self.__elapsed(self.submitted_at, self.started_at),
+            "running_seconds": self.__elapsed(self.started_at, self.finished_at),
+            "error": self.error,
+        }
+
+    def __elapsed(self, start: float | None, end: float | None) -> float | None:
+        if start is None:
+            return None
+        return round((end or time.time()) - start, 3)
+
+
+class IndexingJobQueue:
+    """
+        In-process queue that indexes submissions in the background.
+        Workers coalesce queued submissions into batches of up to INDEXING_QUEUE_COALESCE_SIZE documents.
+    """
+
+    def __init__(self, indexing_service: VectorIndexingService):
+        self.__indexing_service = indexing_service
+        self.__queue: asyncio.Queue[IndexingJob] = asyncio.Queue(maxsize=configs.get_indexing_queue_max_size())
+        self.__jobs: OrderedDict[str, IndexingJob] = OrderedDict()
+        self.__workers: list[asyncio.Task] = []
+
+    def submit(self, documents: list[IndexableJobDocument], incremental: bool | None = None) -> IndexingJob:
+        """Queue documents for indexing. Raises asyncio.QueueFull when the queue is at capacity."""
+        job = IndexingJob(
+            job_id=str(uuid.uuid4()),
+            documents=documents,
+            incremental=incremental,
+            document_count=len(documents)
+        )
+        self.__queue.put_nowait(job)
+        self.__remember(job)
+        return job
+
+    def get_job(self, job_id: str) -> IndexingJob | None:
+        return self.__jobs.get(job_id)
+
+    def get_stats(self) -> dict:
+        statuses = [job.status for job in self.__jobs.values()]
+        return {
+            "queue_size": self.__queue.qsize(),
+            **{status: statuses.count(status) for status in ("queued", "running", "done", "failed")}
+        }
+
+    async def start(self):
+        for i in range(configs.get_indexing_queue_workers()):
+            self.__workers.append(asyncio.create_task(self.__run_worker(), name=f"indexing-worker-{i}"))
+
+    async def stop(self):
+        for worker in self.__workers:
+            worker.cancel()
+        await asyncio.gather(*self.__workers, return_exceptions=True)
+        self.__workers = []
+
+    async def __run_worker(self):
+        while True:
+            jobs = [await self.__queue.get()]
+            jobs.extend(self.__take_more_jobs(jobs[0].document_count))
+            try:
+                await self.__index_jobs(jobs)
+            finally:
+                for _ in jobs:
+                    self.__queue.task_done()
+
+    def __take_more_jobs(self, document_count: int) -> list[IndexingJob]:
+        coalesce_size = configs.get_indexing_queue_coalesce_size()
+        jobs = []
+        while document_count < coalesce_size and not self.__queue.empty():
+            job = self.__queue.get_nowait()
+            jobs.append(job)
+            document_count += job.document_count
+        return jobs
+
+    async def __index_jobs(self, jobs: list[IndexingJob]):
+        started_at = time.time()
+        for job in jobs:
+            job.status = "running"
+            job.started_at = started_at
+            job.coalesced_jobs = len(jobs)
+
+        # incremental and full submissions are indexed in separate batches
+        by_mode: dict[bool | None, list[IndexingJob]] = {}
+        for job in jobs:
+            by_mode.setdefault(job.incremental, []).append(job)
+
+        for incremental, mode_jobs in by_mode.items():
+            documents = [doc for job in mode_jobs for doc in job.documents]
+            try:
+                counts = await self.__indexing_service.insert_documents(documents, incremental=incremental)
+                self.__finish(mode_jobs, "done", counts=counts)
+            except Exception as error:
+                logging.exception(f"Indexing batch of {len(mode_jobs)} jobs failed")
+                self.__finish(mode_jobs, "failed", error=str(error))
+
+    def __finish(self, jobs: list[IndexingJob], status: str, counts: dict | None = None, error: str | None = None):
+        finished_at = time.time()
+        for job in jobs:
+            job.status = status
+            job.finished_at = finished_at
+            job.batch_counts = counts or {}
+            job.error = error
+            job.documents = [] # release memory once indexed
+
+    def __remember(self, job: IndexingJob):
+        self.__jobs[job.job_id] = job
+        history_size = configs.get_indexing_job_history_size()
+        while len(self.__jobs) > history_size:
+            oldest_id = next(iter(self.__jobs))
+            if self.__jobs[oldest_id].status in ("queued", "running"):
+                break
+            del self.__jobs[oldest_id]
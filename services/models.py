@@ -1,4 +1,6 @@
 from dataclasses import dataclass
+import json
+import numpy as np
 import uuid
 
 @dataclass
@@ -19,6 +21,11 @@ class BaseJobDocument:
         responsibilities_text = " ".join(sorted(self.llm_responsibilities))
         return f"short description: {self.short_description.lower()}, responsibilities: {responsibilities_text.lower()}"
 
+    def _get_content_id(self) -> str:
+        """Deterministic id of the company and both vector texts"""
+        text_content = f"{self.company_slug}-{self._get_skills_vector_text()}-{self._get_responsibilities_vector_text()}"
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, text_content))
+
 @dataclass
 class IndexableJobDocument(BaseJobDocument):
     job_id: str
@@ -27,22 +34,71 @@ class IndexableJobDocument(BaseJobDocument):
     source: str
 
     def _get_document_id(self):
-        text_content = f"{self.company_slug}-{self._get_skills_vector_text()}-{self._get_responsibilities_vector_text()}"
-        return str(uuid.uuid5(uuid.NAMESPACE_URL, text_content))
+        return self._get_content_id()
     
     def _get_payload(self):
         return {
             "job_id": self.job_id,
             "titles": self.selected_titles,
             "hop_level": self.hop_level,
-            "source": self.source
+            "source": self.source,
+            # source fields, so points can be re-embedded without the original request
+            "company_slug": self.company_slug,
+            "llm_primary_title": self.llm_primary_title,
+            "llm_secondary_title": self.llm_secondary_title,
+            "short_description": self.short_description,
+            "llm_responsibilities": self.llm_responsibilities,
+            "llm_skills": self.llm_skills,
         }
 
+    @classmethod
+    def _from_payload(cls, payload: dict) -> "IndexableJobDocument":
+        """Rebuild a document from a stored payload. Raises KeyError for points indexed without source fields."""
+        return cls(
+            job_id=payload["job_id"],
+            company_slug=payload["company_slug"],
+            llm_primary_title=payload["llm_primary_title"],
+            llm_secondary_title=payload["llm_secondary_title"],
+            short_description=payload["short_description"],
+            llm_responsibilities=payload["llm_responsibilities"],
+            llm_skills=payload["llm_skills"],
+            selected_titles=payload["titles"],
+            hop_level=payload["hop_level"],
+            source=payload["source"]
+        )
+
 @dataclass
 class SearchableJobDocument(BaseJobDocument):
     pass
 
 
+@dataclass
+class SearchFilters:
+    """Restricts which indexed jobs a search considers. None or an empty list means no restriction."""
+    sources: list[str] | None = None
+    max_hop_level: int | None = None
+    exclude_company_slugs: list[str] | None = None
+
+    def _is_empty(self) -> bool:
+        return not self.sources and self.max_hop_level is None and not self.exclude_company_slugs
+
+    def _get_cache_key(self) -> str:
+        # order-insensitive, so equivalent filters share suggestion cache entries
+        return json.dumps([sorted(self.sources or []), self.max_hop_level, sorted(self.exclude_company_slugs or [])])
+
+
+# adjusted score = score * level factor * source factor, never above the raw score
+MIN_LEVEL = 0.6
+LEVEL_PENALTY = 0.12
+SOURCE_FACTORS = {
+    "human": 1.1,
+    "taxonomy": 1.1, # when taxonomy matches for both the llm titles
+    "gpt_verified": 1.0,  # when vector or taxonomy result is gpt verified
+    "vector_auto": 0.95,
+    "gpt_suggest": 0.95,
+}
+DEFAULT_SOURCE_FACTOR = 0.8
+
 @dataclass
 class SearchResult:
     job_id: str
@@ -59,15 +115,54 @@ class SearchResult:
         self.source = vector_result['payload']['source']
     
     def _adjusted_score(self) -> float:
-        MIN_LEVEL = 0.6
-        LEVEL_PENALTY = 0.12
-        SOURCE_FACTORS = {
-            "human": 1.1,
-            "taxonomy": 1.1, # when taxonomy matches for both the llm titles
-            "gpt_verified": 1.0,  # when vector or taxonomy result is gpt verified
-            "vector_auto": 0.95,
-            "gpt_suggest": 0.95,
-        }
         level_factor = max(MIN_LEVEL, 1.0 - (self.hop_level * LEVEL_PENALTY))
-        source_factor = SOURCE_FACTORS.get(self.source, 0.8)
+        source_factor = SOURCE_FACTORS.get(self.source, DEFAULT_SOURCE_FACTOR)
         return min(self.score * level_factor * source_factor, self.score)
+
+
+@dataclass
+class SearchResultBatch:
+    """
+        The results of one vector search as parallel arrays. Titles are ids into a vocabulary
+        shared with the other vector's results, so both sides can be intersected by id.
+        Titles of result i are title_ids[title_offsets[i]:title_offsets[i + 1]], deduplicated.
+    """
+    job_ids: list[str]
+    sources: list[str]
+    scores: np.ndarray # float64
+    hop_levels: np.ndarray # int64
+    source_factors: np.ndarray # float64
+    title_offsets: np.ndarray # int64, one more than the number of results
+    title_ids: np.ndarray # int64
+    vocabulary: dict[str, int]
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def _adjusted_scores(self) -> np.ndarray:
+        """SearchResult._adjusted_score of every result, with the same float arithmetic"""
+        level_factors = np.maximum(MIN_LEVEL, 1.0 - (self.hop_levels * LEVEL_PENALTY))
+        return np.minimum(self.scores * level_factors * self.source_factors, self.scores)
+
+    @classmethod
+    def _from_vector_results(cls, vector_results: list[dict], vocabulary: dict[str, int]) -> "SearchResultBatch":
+        """Build from vector_store result dicts, adding unseen titles to `vocabulary`"""
+        title_ids = []
+        title_offsets = [0]
+        for result in vector_results:
+            # same iteration order as the per-result set(titles) of the dict-based merge
+            for title in set(result['payload']['titles']):
+                title_ids.append(vocabulary.setdefault(title, len(vocabulary)))
+            title_offsets.append(len(title_ids))
+        payloads = [result['payload'] for result in vector_results]
+        sources = [payload['source'] for payload in payloads]
+        return cls(
+            job_ids=[payload['job_id'] for payload in payloads],
+            sources=sources,
+            scores=np.array([result['score'] for result in vector_results], dtype=np.float64),
+            hop_levels=np.array([payload['hop_level'] for payload in payloads], dtype=np.int64),
+            source_factors=np.array([SOURCE_FACTORS.get(source, DEFAULT_SOURCE_FACTOR) for source in sources], dtype=np.float64),
+            title_offsets=np.array(title_offsets, dtype=np.int64),
+            title_ids=np.array(title_ids, dtype=np.int64),
+            vocabulary=vocabulary
+        )
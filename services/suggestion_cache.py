@@ -0,0 +1,119 @@
+from storage.cache import DiskCache, LRUCache
+from configs.configs import configs
+import asyncio
+import json
+import threading
+import time
+
+class SuggestionCache:
+    """
+        Merged search_items results keyed by SearchableJobDocument._get_content_id(),
+        suffixed with SearchFilters._get_cache_key() for filtered searches.
+
+        Entries are tagged with an index generation that insert_documents bumps, so
+        suggestions computed before new documents were indexed are dropped on read.
+        With SUGGESTION_CACHE_PATH set, entries and the generation live in a sqlite
+        file shared by every worker process on the host, capped at SUGGESTION_CACHE_MAX_ROWS.
+    """
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(SuggestionCache, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            ttl_seconds = configs.get_suggestion_cache_ttl_seconds()
+            path = configs.get_suggestion_cache_path()
+            self.__enabled = configs.get_suggestion_cache_size() > 0
+            self.__memory = LRUCache(max_size=configs.get_suggestion_cache_size(), ttl_seconds=ttl_seconds)
+            self.__shared = DiskCache(
+                path,
+                ttl_seconds=ttl_seconds,
+                max_rows=configs.get_suggestion_cache_max_rows()
+            ) if path and self.__enabled else None
+            self.__generation = 0
+            self.__lock = threading.Lock()
+            self._initialized = True
+
+    async def get_many(self, content_ids: list[str]) -> list[list[dict] | None]:
+        """Cached suggestions in the order of `content_ids`, None where missing or stale"""
+        if not self.__enabled:
+            return [None] * len(content_ids)
+        if self.__shared is None:
+            return self.__get_many(content_ids, self.__generation)
+        # sqlite reads must not block the event loop
+        return await asyncio.to_thread(self.__get_many_shared, content_ids)
+
+    async def set_many(self, suggestions_by_id: dict[str, list[dict]], generation: int):
+        """`generation` must be read before searching, so a concurrent bump invalidates the entries"""
+        if not self.__enabled or len(suggestions_by_id) == 0:
+            return
+        entries = {
+            content_id: {"generation": generation, "suggestions": suggestions}
+            for content_id, suggestions in suggestions_by_id.items()
+        }
+        for content_id, entry in entries.items():
+            self.__memory.set(content_id, entry)
+        if self.__shared is not None:
+            await asyncio.to_thread(self.__shared.set_many, {
+                content_id: json.dumps(entry).encode("utf-8") for content_id, entry in entries.items()
+            })
+
+    async def get_generation(self) -> int:
+        if self.__shared is not None:
+            return await asyncio.to_thread(self.__shared.get_counter, "generation")
+        return self.__generation
+
+    async def bump_generation(self):
+        """Called after indexing, drops every suggestion cached so far"""
+        if not self.__enabled:
+            return
+        if self.__shared is not None:
+            await asyncio.to_thread(self.__bump_shared_generation)
+        else:
+            with self.__lock:
+                self.__generation += 1
+        self.__memory.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            "generation": self.__shared.get_counter("generation") if self.__shared is not None else self.__generation,
+            "memory_hits": self.__memory.hits,
+            "memory_misses": self.__memory.misses,
+            "memory_size": len(self.__memory),
+        }
+
+    def __get_many_shared(self, content_ids: list[str]) -> list[list[dict] | None]:
+        generation = self.__shared.get_counter("generation") # type: ignore
+        suggestions = self.__get_many(content_ids, generation)
+        missing = [content_id for content_id, cached in zip(content_ids, suggestions) if cached is None]
+        stored = self.__shared.get_many(missing) # type: ignore
+        for i, content_id in enumerate(content_ids):
+            if suggestions[i] is None and content_id in stored:
+                entry = json.loads(stored[content_id])
+                if entry["generation"] == generation:
+                    suggestions[i] = entry["suggestions"]
+        return suggestions
+
+    def __get_many(self, content_ids: list[str], generation: int) -> list[list[dict] | None]:
+        suggestions = []
+        for content_id in content_ids:
+            entry = self.__memory.get(content_id)
+            suggestions.append(entry["suggestions"] if entry is not None and entry["generation"] == generation else None)
+        return suggestions
+
+    def __bump_shared_generation(self):
+        # entries written before the bump were computed under an older generation
+        bumped_at = time.time()
+        self.__shared.increment_counter("generation") # type: ignore
+        self.__shared.delete_created_before(bumped_at) # type: ignore
+
+    @classmethod
+    def get_instance(cls):
+        """Get the singleton instance of SuggestionCache"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
@@ -0,0 +1,217 @@
+from services.models import SearchResult, SearchResultBatch
+from configs.configs import configs
+from monitoring import metrics
+import numpy as np
+
+SCORE_REDUCTION_FACTOR = 0.5 # reduce score since a single-index entry comes from one index only
+CLOSENESS_ABS_DELTA = 0.05
+
+def merge_vector_results(skill_vector_results: list[dict], res_vector_results: list[dict]) -> list[dict]:
+    """
+        Merge the vector_store results of one query. Small result lists use the per-result
+        dict merge, since NumPy's fixed per-call overhead dominates there; larger ones are
+        converted to SearchResultBatch. Both paths produce identical output.
+    """
+    if max(len(skill_vector_results), len(res_vector_results)) < configs.get_array_merge_min_results():
+        return merge_result_lists(
+            [SearchResult(result) for result in skill_vector_results],
+            [SearchResult(result) for result in res_vector_results]
+        )
+    # both sides share a title vocabulary so they intersect by id
+    vocabulary = {}
+    return merge_suggestions(
+        SearchResultBatch._from_vector_results(skill_vector_results, vocabulary),
+        SearchResultBatch._from_vector_results(res_vector_results, vocabulary)
+    )
+
+def merge_result_lists(skill_results: list[SearchResult], res_results: list[SearchResult]) -> list[dict]:
+    """Titles found by both searches, aggregated one result at a time"""
+    with metrics.STAGE_SECONDS.labels("extract_unique_suggestions").time():
+        skill_suggestions = _extract_unique_suggestion_dicts(skill_results)
+        responsibility_suggestions = _extract_unique_suggestion_dicts(res_results)
+
+    # intersection titles
+    merged_suggestions = []
+    for title in skill_suggestions:
+        if title in responsibility_suggestions:
+            skill_entry = skill_suggestions[title]
+            res_entry = responsibility_suggestions[title]
+            merged_suggestions.append({
+                'suggestion_source': 'both',
+                'title': title,
+                'score': skill_entry['adjusted_score'] + res_entry['adjusted_score'],
+                # union job match ids.
+                'match_job_ids': list(skill_entry['match_job_ids'].union(res_entry['match_job_ids'])),
+                'skill_sources': list(skill_entry['sources']),
+                'res_sources': list(res_entry['sources']),
+                'skill_origins_count': skill_entry['origins_count'],
+                'res_origins_count': res_entry['origins_count'],
+                'min_hop': min(skill_entry['min_hop'], res_entry['min_hop']),
+                'max_hop': max(skill_entry['min_hop'], res_entry['min_hop']),
+            })
+    return merged_suggestions
+
+def _extract_unique_suggestion_dicts(results: list[SearchResult]) -> dict:
+    if len(results) == 0:
+        return {}
+    results = sorted(results, key=lambda x: x._adjusted_score(), reverse=True)
+    unique_suggestions = {}
+    for match_result in results:
+        for title in set(match_result.titles): # only loop once per title in match_result
+            if title in unique_suggestions:
+                entry = unique_suggestions[title]
+                entry['match_job_ids'].add(match_result.job_id)
+                entry['sources'].add(match_result.source)
+                entry['origins_count'] += 1
+                # if new result has lower hop level, and score is close enough to original score, then only update min_hop
+                if match_result.hop_level < entry['min_hop']:
+                    if abs(match_result.score - entry['original_score']) <= CLOSENESS_ABS_DELTA:
+                        entry['min_hop'] = match_result.hop_level
+                        entry['original_score'] = match_result.score
+                entry['adjusted_score'] = max(entry['adjusted_score'], match_result._adjusted_score() * SCORE_REDUCTION_FACTOR)
+            else:
+                unique_suggestions[title] = {
+                    'adjusted_score': match_result._adjusted_score() * SCORE_REDUCTION_FACTOR,
+                    'original_score': match_result.score,
+                    'match_job_ids': {match_result.job_id},
+                    'min_hop': match_result.hop_level,
+                    'sources': {match_result.source},
+                    'origins_count': 1
+                }
+    return unique_suggestions
+
+def merge_suggestions(skill_results: SearchResultBatch, res_results: SearchResultBatch) -> list[dict]:
+    """
+        Titles found by both searches, scored by the sum of their per-index adjusted scores.
+        Both batches must share one title vocabulary.
+
+        Aggregation runs on arrays. Job ids and sources are collected in the same order as
+        merge_result_lists, so the output matches it exactly.
+    """
+    with metrics.STAGE_SECONDS.labels("extract_unique_suggestions").time():
+        skill_suggestions = extract_unique_suggestions(skill_results)
+        responsibility_suggestions = extract_unique_suggestions(res_results)
+
+    skill_entries = _to_entries(skill_results, skill_suggestions)
+    res_entries = {entry[0]: entry for entry in _to_entries(res_results, responsibility_suggestions)}
+    titles = list(skill_results.vocabulary)
+    merged_suggestions = []
+    for title_id, skill_score, skill_min_hop, skill_origins_count, skill_job_ids, skill_sources in skill_entries:
+        res_entry = res_entries.get(title_id)
+        if res_entry is None:
+            continue
+        _, res_score, res_min_hop, res_origins_count, res_job_ids, res_sources = res_entry
+        merged_suggestions.append({
+            'suggestion_source': 'both',
+            'title': titles[title_id],
+            'score': skill_score + res_score,
+            # union job match ids.
+            'match_job_ids': list(set(skill_job_ids).union(set(res_job_ids))),
+            'skill_sources': list(set(skill_sources)),
+            'res_sources': list(set(res_sources)),
+            'skill_origins_count': skill_origins_count,
+            'res_origins_count': res_origins_count,
+            'min_hop': min(skill_min_hop, res_min_hop),
+            'max_hop': max(skill_min_hop, res_min_hop),
+        })
+    return merged_suggestions
+
+def extract_unique_suggestions(results: SearchResultBatch) -> dict[str, np.ndarray]:
+    """
+        Per-title aggregates as arrays, with titles in the order they are first seen when
+        scanning results from the highest adjusted score down.
+
+        "occurrence_results" lists the result index of every (result, title) pair, grouped
+        by title in scan order. "occurrence_starts"/"origins_count" give each title's slice.
+    """
+    adjusted_scores = results._adjusted_scores()
+    order = np.argsort(-adjusted_scores, kind="stable")
+
+    # one occurrence per (result, title) pair, in scan order
+    counts = np.diff(results.title_offsets)[order]
+    total = int(counts.sum())
+    if total == 0:
+        return _empty_aggregates()
+    occurrence_results = np.repeat(order, counts)
+    position_in_result = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    occurrence_titles = results.title_ids[np.repeat(results.title_offsets[order], counts) + position_in_result]
+
+    # group by title; the stable sort keeps scan order inside every group
+    grouping = np.argsort(occurrence_titles, kind="stable")
+    grouped_titles = occurrence_titles[grouping]
+    grouped_results = occurrence_results[grouping]
+    group_starts = np.flatnonzero(_starts_of_runs(grouped_titles))
+    group_sizes = np.diff(np.append(group_starts, total))
+    group_of = np.repeat(np.arange(len(group_starts)), group_sizes)
+
+    adjusted_score = np.maximum.reduceat(adjusted_scores[grouped_results] * SCORE_REDUCTION_FACTOR, group_starts)
+
+    # min_hop moves to a later, lower-hop result only when its score is close to the score
+    # of the result that set the current min_hop. Each pass applies the next such move of
+    # every title at once; min_hop strictly decreases, so this ends after a few passes.
+    hops = results.hop_levels[grouped_results]
+    current = group_starts.copy()
+    if len(group_starts) < total:
+        scores = results.scores[grouped_results]
+        positions = np.arange(total)
+        while True:
+            moves = np.flatnonzero(
+                (positions > current[group_of])
+                & (hops < hops[current][group_of])
+                & (np.abs(scores - scores[current][group_of]) <= CLOSENESS_ABS_DELTA)
+            )
+            if len(moves) == 0:
+                break
+            # moves are in position order, so the first move of each group starts a run
+            first_moves = moves[_starts_of_runs(group_of[moves])]
+            current[group_of[first_moves]] = first_moves
+
+    # groups are ordered by title id, report them by first appearance instead
+    first_seen = np.argsort(grouping[group_starts], kind="stable")
+    return {
+        "title_ids": grouped_titles[group_starts][first_seen],
+        "adjusted_score": adjusted_score[first_seen],
+        "min_hop": hops[current][first_seen],
+        "origins_count": group_sizes[first_seen],
+        "occurrence_starts": group_starts[first_seen],
+        "occurrence_results": grouped_results,
+    }
+
+def _to_entries(results: SearchResultBatch, aggregates: dict) -> list[tuple]:
+    """
+        (title id, adjusted score, min_hop, origins count, job ids, sources) per title as
+        plain Python values. Job ids and sources are lists in scan order; sets built from
+        them iterate in the same order as sets filled one result at a time.
+    """
+    occurrence_results = aggregates["occurrence_results"].tolist()
+    job_ids = [results.job_ids[i] for i in occurrence_results]
+    sources = [results.sources[i] for i in occurrence_results]
+    starts = aggregates["occurrence_starts"].tolist()
+    counts = aggregates["origins_count"].tolist()
+    return [
+        (title_id, adjusted_score, min_hop, count, job_ids[start:start + count], sources[start:start + count])
+        for title_id, adjusted_score, min_hop, count, start in zip(
+            aggregates["title_ids"].tolist(),
+            aggregates["adjusted_score"].tolist(),
+            aggregates["min_hop"].tolist(),
+            counts,
+            starts
+        )
+    ]
+
+def _starts_of_runs(values: np.ndarray) -> np.ndarray:
+    starts = np.empty(len(values), dtype=bool)
+    starts[:1] = True
+    np.not_equal(values[1:], values[:-1], out=starts[1:])
+    return starts
+
+def _empty_aggregates() -> dict[str, np.ndarray]:
+    empty = np.empty(0, dtype=np.int64)
+    return {
+        "title_ids": empty,
+        "adjusted_score": np.empty(0, dtype=np.float64),
+        "min_hop": empty,
+        "origins_count": empty,
+        "occurrence_starts": empty,
+        "occurrence_results": empty,
+    }
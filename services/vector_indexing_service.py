@@ -1,33 +1,176 @@
 from services.models import IndexableJobDocument
+from services.suggestion_cache import SuggestionCache
 from storage.vectorizer import Vectorizer
 from storage import vector_store
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient
 from configs.configs import configs
+from monitoring import metrics
+from typing import AsyncIterator
+import asyncio
+import logging
+import time
 
 class VectorIndexingService:
-    __q_client: QdrantClient
+    __q_client: AsyncQdrantClient
     __vectorizer: Vectorizer
+    __suggestion_cache: SuggestionCache
+    __collection_suffix: str | None
 
-    def __init__(self):
-        self.__q_client = QdrantClient(configs.get_qdrant_url())
+    def __init__(self, client: AsyncQdrantClient | None = None, collection_suffix: str | None = None):
+        """`collection_suffix` writes to `<collection>_<suffix>` instead, as scripts.reindex does"""
+        self.__q_client = client if client is not None else vector_store.get_shared_client()
+        self.__collection_suffix = collection_suffix
         self.__vectorizer = Vectorizer.get_instance()
+        self.__suggestion_cache = SuggestionCache.get_instance()
 
-    def insert_documents(self, documents: list[IndexableJobDocument]):
-        skill_vector_items = [self.__to_skills_vector_item(doc) for doc in documents]
-        vector_store.insert_items(
-            client = self.__q_client,
-            collection_name = configs.get_skills_collection_name(),
-            vectorizer = self.__vectorizer,
-            items = skill_vector_items
+    async def insert_documents(self, documents: list[IndexableJobDocument], incremental: bool | None = None) -> dict:
+        """
+            Embed and upsert documents into the collections of the configured storage layout.
+
+            In incremental mode documents whose deterministic id is already indexed have
+            unchanged vector texts, so only their payload is updated.
+        """
+        if incremental is None:
+            incremental = configs.is_incremental_indexing_enabled()
+        # the same content maps to the same id, keep the last submission
+        documents = list({doc._get_document_id(): doc for doc in documents}.values())
+
+        existing_ids = await self.__get_existing_ids(documents) if incremental else set()
+        new_documents = [doc for doc in documents if doc._get_document_id() not in existing_ids]
+        unchanged_documents = [doc for doc in documents if doc._get_document_id() in existing_ids]
+
+        await self.__insert_new_documents(new_documents)
+        await self.__update_payloads(unchanged_documents)
+        await self.__suggestion_cache.bump_generation()
+        return {
+            "embedded": len(new_documents),
+            "payload_updated": len(unchanged_documents)
+        }
+
+    async def insert_document_stream(
+            self,
+            documents: AsyncIterator[IndexableJobDocument],
+            incremental: bool | None = None) -> dict:
+        """
+            Index documents from an async iterator in batches of STREAM_INDEXING_BATCH_SIZE.
+            Only one batch is held in memory at a time, whatever the stream length.
+        """
+        batch_size = configs.get_stream_indexing_batch_size()
+        log_interval = configs.get_stream_progress_log_interval()
+        counts = {"received": 0, "embedded": 0, "payload_updated": 0}
+        started_at = time.perf_counter()
+        batch = []
+        async for document in documents:
+            batch.append(document)
+            if len(batch) >= batch_size:
+                await self.__insert_stream_batch(batch, incremental, counts)
+                batch = []
+                if counts["received"] % log_interval < batch_size:
+                    self.__log_stream_progress(counts, started_at)
+        if len(batch) > 0:
+            await self.__insert_stream_batch(batch, incremental, counts)
+        counts["elapsed_seconds"] = round(time.perf_counter() - started_at, 3)
+        self.__log_stream_progress(counts, started_at)
+        return counts
+
+    async def __insert_stream_batch(self, batch: list[IndexableJobDocument], incremental: bool | None, counts: dict):
+        batch_counts = await self.insert_documents(batch, incremental=incremental)
+        counts["received"] += len(batch)
+        counts["embedded"] += batch_counts["embedded"]
+        counts["payload_updated"] += batch_counts["payload_updated"]
+
+    def __log_stream_progress(self, counts: dict, started_at: float):
+        elapsed = time.perf_counter() - started_at
+        rate = counts["received"] / elapsed if elapsed > 0 else 0.0
+        logging.info(
+            f"Stream indexing: {counts['received']} received, {counts['embedded']} embedded, "
+            f"{counts['payload_updated']} payload updated, {rate:.1f} docs/s"
         )
 
-        res_vector_items = [self.__to_responsibilities_vector_item(doc) for doc in documents]
-        vector_store.insert_items(
-            client = self.__q_client,
-            collection_name = configs.get_responsibilities_collection_name(),
-            vectorizer = self.__vectorizer,
-            items = res_vector_items
+    async def __insert_new_documents(self, documents: list[IndexableJobDocument]):
+        # the next chunk is embedded while the pipeline writes the previous one
+        pipeline = vector_store.UpsertPipeline(self.__q_client)
+        chunk_size = configs.get_upsert_chunk_size()
+        for start in range(0, len(documents), chunk_size):
+            chunk = documents[start:start + chunk_size]
+            with metrics.STAGE_SECONDS.labels("text_building").time():
+                skill_vector_items = [self.__to_skills_vector_item(doc) for doc in chunk]
+                res_vector_items = [self.__to_responsibilities_vector_item(doc) for doc in chunk]
+            await self.__embed_items(skill_vector_items + res_vector_items)
+
+            if configs.is_combined_storage_layout():
+                await pipeline.submit(
+                    self.__collection_name(configs.get_jobs_collection_name()),
+                    [
+                        vector_store.to_combined_point(skill_item, res_item)
+                        for skill_item, res_item in zip(skill_vector_items, res_vector_items)
+                    ]
+                )
+                continue
+            await pipeline.submit(
+                self.__collection_name(configs.get_skills_collection_name()),
+                [vector_store.to_point(item) for item in skill_vector_items]
+            )
+            await pipeline.submit(
+                self.__collection_name(configs.get_responsibilities_collection_name()),
+                [vector_store.to_point(item) for item in res_vector_items]
+            )
+        await pipeline.drain()
+
+    async def __update_payloads(self, documents: list[IndexableJobDocument]):
+        if len(documents) == 0:
+            return
+        if configs.is_combined_storage_layout():
+            await vector_store.update_payloads(
+                client = self.__q_client,
+                collection_name = self.__collection_name(configs.get_jobs_collection_name()),
+                items = [self.__to_skills_vector_item(doc) for doc in documents]
+            )
+            return
+        await asyncio.gather(
+            vector_store.update_payloads(
+                client = self.__q_client,
+                collection_name = self.__collection_name(configs.get_skills_collection_name()),
+                items = [self.__to_skills_vector_item(doc) for doc in documents]
+            ),
+            vector_store.update_payloads(
+                client = self.__q_client,
+                collection_name = self.__collection_name(configs.get_responsibilities_collection_name()),
+                items = [self.__to_responsibilities_vector_item(doc) for doc in documents]
+            )
+        )
+
+    async def __get_existing_ids(self, documents: list[IndexableJobDocument]) -> set[str]:
+        document_ids = [doc._get_document_id() for doc in documents]
+        if configs.is_combined_storage_layout():
+            return await vector_store.retrieve_existing_ids(
+                client = self.__q_client,
+                collection_name = self.__collection_name(configs.get_jobs_collection_name()),
+                item_ids = document_ids
+            )
+        # a point counts as indexed only when both collections have it
+        skill_ids, res_ids = await asyncio.gather(
+            vector_store.retrieve_existing_ids(
+                client = self.__q_client,
+                collection_name = self.__collection_name(configs.get_skills_collection_name()),
+                item_ids = document_ids
+            ),
+            vector_store.retrieve_existing_ids(
+                client = self.__q_client,
+                collection_name = self.__collection_name(configs.get_responsibilities_collection_name()),
+                item_ids = document_ids
+            )
         )
+        return skill_ids & res_ids
+
+    def __collection_name(self, name: str) -> str:
+        return name if self.__collection_suffix is None else f"{name}_{self.__collection_suffix}"
+
+    async def __embed_items(self, items: list[vector_store.VectorItem]):
+        # skills and responsibilities texts share the same forward passes
+        embeddings = await self.__vectorizer.generate_embeddings_async([item.text for item in items])
+        for item, embedding in zip(items, embeddings):
+            item.vector = embedding
     
     def __to_skills_vector_item(self, document: IndexableJobDocument) -> vector_store.VectorItem:
         return vector_store.VectorItem(
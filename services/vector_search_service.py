@@ -1,124 +1,152 @@
-from services.models import SearchableJobDocument, SearchResult
+from services.models import SearchableJobDocument, SearchFilters
+from services.suggestion_merge import merge_vector_results
+from services.suggestion_cache import SuggestionCache
 from storage.vectorizer import Vectorizer
 from storage import vector_store
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, models
 from configs.configs import configs
+from monitoring import metrics
+import asyncio
 import logging
 
 class VectorSearchService:
-    __q_client: QdrantClient
+    __q_client: AsyncQdrantClient
     __vectorizer: Vectorizer
+    __suggestion_cache: SuggestionCache
 
-    def __init__(self):
-        self.__q_client = QdrantClient(configs.get_qdrant_url())
+    def __init__(self, client: AsyncQdrantClient | None = None):
+        self.__q_client = client if client is not None else vector_store.get_shared_client()
         self.__vectorizer = Vectorizer.get_instance()
+        self.__suggestion_cache = SuggestionCache.get_instance()
+
+    async def search_items(self, document: SearchableJobDocument, filters: SearchFilters | None = None):
+        cache_key = self.__get_cache_key(document, filters)
+        cached = (await self.__suggestion_cache.get_many([cache_key]))[0]
+        if cached is not None:
+            return cached
+        generation = await self.__suggestion_cache.get_generation()
+        suggestions = await self.__search_uncached(document, self.__to_query_filter(filters))
+        await self.__suggestion_cache.set_many({cache_key: suggestions}, generation)
+        return suggestions
+
+    async def search_items_batch(
+            self,
+            documents: list[SearchableJobDocument],
+            filters: SearchFilters | None = None) -> list[list[dict]]:
+        """Suggestions for many documents at once, returned in input order. `filters` apply to every document."""
+        cache_keys = [self.__get_cache_key(document, filters) for document in documents]
+        suggestions = await self.__suggestion_cache.get_many(cache_keys)
+        missing = [i for i, cached in enumerate(suggestions) if cached is None]
+        if len(missing) == 0:
+            return suggestions # type: ignore
+
+        generation = await self.__suggestion_cache.get_generation()
+        computed = await self.__search_uncached_batch([documents[i] for i in missing], self.__to_query_filter(filters))
+        for i, document_suggestions in zip(missing, computed):
+            suggestions[i] = document_suggestions
+        await self.__suggestion_cache.set_many({cache_keys[i]: suggestions[i] for i in missing}, generation) # type: ignore
+        return suggestions # type: ignore
+
+    def __get_cache_key(self, document: SearchableJobDocument, filters: SearchFilters | None) -> str:
+        content_id = document._get_content_id()
+        if filters is None or filters._is_empty():
+            return content_id
+        return f"{content_id}:{filters._get_cache_key()}"
+
+    def __to_query_filter(self, filters: SearchFilters | None) -> models.Filter | None:
+        if filters is None:
+            return None
+        return vector_store.build_filter(
+            sources = filters.sources,
+            max_hop_level = filters.max_hop_level,
+            exclude_company_slugs = filters.exclude_company_slugs
+        )
 
-    def search_items(self, document: SearchableJobDocument):
-        skill_suggestions = self.__get_skill_based_suggestions(document)
-        responsibilities_suggestions = self.__get_responsibility_based_suggestions(document)
-
+    async def __search_uncached(self, document: SearchableJobDocument, query_filter: models.Filter | None = None):
+        with metrics.STAGE_SECONDS.labels("text_building").time():
+            texts = [document._get_skills_vector_text(), document._get_responsibilities_vector_text()]
+        # both query texts go through a single forward pass
+        skills_vector, responsibilities_vector = await self.__vectorizer.generate_embeddings_async(texts)
+        skill_batch, responsibility_batch = await self.__search_vectors([skills_vector], [responsibilities_vector], query_filter)
+        return self.__to_suggestions(skill_batch[0], responsibility_batch[0])
+
+    async def __search_uncached_batch(
+            self,
+            documents: list[SearchableJobDocument],
+            query_filter: models.Filter | None = None) -> list[list[dict]]:
+        if len(documents) == 0:
+            return []
+        texts = []
+        with metrics.STAGE_SECONDS.labels("text_building").time():
+            for document in documents:
+                texts.append(document._get_skills_vector_text())
+                texts.append(document._get_responsibilities_vector_text())
+        vectors = await self.__vectorizer.generate_embeddings_async(texts)
+
+        skill_batch, responsibility_batch = await self.__search_vectors(vectors[0::2], vectors[1::2], query_filter)
+        return [
+            self.__to_suggestions(skill_results, responsibility_results)
+            for skill_results, responsibility_results in zip(skill_batch, responsibility_batch)
+        ]
+
+    async def __search_vectors(
+            self,
+            skills_vectors: list[list[float]],
+            responsibilities_vectors: list[list[float]],
+            query_filter: models.Filter | None = None) -> tuple[list[list[dict]], list[list[dict]]]:
+        """Skills and responsibilities results per query, with all searches issued together"""
+        if configs.is_combined_storage_layout():
+            # one batched query against both named vectors
+            queries = [(vector_store.SKILLS_VECTOR_NAME, vector) for vector in skills_vectors]
+            queries += [(vector_store.RESPONSIBILITIES_VECTOR_NAME, vector) for vector in responsibilities_vectors]
+            results = await vector_store.search_named_vectors(
+                client = self.__q_client,
+                collection_name=configs.get_jobs_collection_name(),
+                queries=queries,
+                top_k=configs.get_search_top_k(),
+                score_threshold=configs.get_search_score_threshold(),
+                query_filter=query_filter
+            )
+            skill_batch, responsibility_batch = results[:len(skills_vectors)], results[len(skills_vectors):]
+        else:
+            skill_batch, responsibility_batch = await asyncio.gather(
+                vector_store.search_named_vectors(
+                    client = self.__q_client,
+                    collection_name=configs.get_skills_collection_name(),
+                    queries=[(vector_store.DEFAULT_VECTOR_NAME, vector) for vector in skills_vectors],
+                    top_k=configs.get_search_top_k(),
+                    score_threshold=configs.get_search_score_threshold(),
+                    query_filter=query_filter
+                ),
+                vector_store.search_named_vectors(
+                    client = self.__q_client,
+                    collection_name=configs.get_responsibilities_collection_name(),
+                    queries=[(vector_store.DEFAULT_VECTOR_NAME, vector) for vector in responsibilities_vectors],
+                    top_k=configs.get_search_top_k(),
+                    score_threshold=configs.get_search_score_threshold(),
+                    query_filter=query_filter
+                )
+            )
+        for results in skill_batch:
+            metrics.SEARCH_RESULTS.labels("skills").observe(len(results))
+        for results in responsibility_batch:
+            metrics.SEARCH_RESULTS.labels("responsibilities").observe(len(results))
+        return skill_batch, responsibility_batch
+
+    def __to_suggestions(self, skill_suggestions: list[dict], responsibilities_suggestions: list[dict]):
         if len(skill_suggestions) == 0 or len(responsibilities_suggestions) == 0:
             logging.warning("No suggestions found for the given document.")
+            reason = "no_skill_matches" if len(skill_suggestions) == 0 else "no_responsibility_matches"
+            metrics.EMPTY_SUGGESTIONS.labels(reason).inc()
+            metrics.SUGGESTIONS.observe(0)
             return []
-        
-        return self.__get_merged_suggestions(skill_suggestions, responsibilities_suggestions)
-    
 
-    def __get_skill_based_suggestions(self, document: SearchableJobDocument) -> list[SearchResult]:
-        skills_text = document._get_skills_vector_text()
-        results = vector_store.search_items(
-            client = self.__q_client,
-            collection_name=configs.get_skills_collection_name(),
-            vectorizer= self.__vectorizer,
-            query_text=skills_text,
-            top_k=5,
-            score_threshold=0.8
-        )
-        skill_suggestions = [SearchResult(res) for res in results]
-        return skill_suggestions
-    
-    def __get_responsibility_based_suggestions(self, document: SearchableJobDocument) -> list[SearchResult]:
-        responsibilities_text = document._get_responsibilities_vector_text()
-        results = vector_store.search_items(
-            client = self.__q_client,
-            collection_name=configs.get_responsibilities_collection_name(),
-            vectorizer= self.__vectorizer,
-            query_text=responsibilities_text,
-            top_k=5,
-            score_threshold=0.8
-        )
-        responsibility_suggestions = [SearchResult(res) for res in results]
-        return responsibility_suggestions
-
-    def __get_merged_suggestions(self, skill_results: list[SearchResult], res_results: list[SearchResult]):
-        skill_suggestions = self.__extract_unique_suggestions(skill_results)
-        responsibility_suggestions = self.__extract_unique_suggestions(res_results)
-
-        # intersection titles
-        merged_suggestions = []
-        for title in skill_suggestions:
-            if title in responsibility_suggestions:
-                skill_entry = skill_suggestions[title]
-                res_entry = responsibility_suggestions[title]
-
-                confidence_score = skill_entry['adjusted_score'] + res_entry['adjusted_score']
-                # union job match ids.
-                match_job_ids = list(
-                    skill_entry['match_job_ids'].union(res_entry['match_job_ids'])
-                )
-
-                merged_suggestions.append({
-                    'suggestion_source': 'both',
-                    'title': title,
-                    'score': confidence_score,
-                    'match_job_ids': match_job_ids,
-                    'skill_sources': list(skill_entry['sources']),
-                    'res_sources': list(res_entry['sources']),
-                    'skill_origins_count': skill_entry['origins_count'],
-                    'res_origins_count': res_entry['origins_count'],
-                    'min_hop': min(skill_entry['min_hop'], res_entry['min_hop']),
-                    'max_hop': max(skill_entry['min_hop'], res_entry['min_hop']),
-                })
-        return merged_suggestions
-
-
-    def __extract_unique_suggestions(self, results: list[SearchResult]) -> dict:
-        if len(results) == 0:
-            return {}
-        
-        results = sorted(results, key=lambda x: x._adjusted_score(), reverse=True)
-        SCORE_REDUCTION_FACTOR = 0.5
-        CLOSENESS_ABS_DELTA = 0.05
-
-        unique_suggestions = {}
-        for match_result in results:
-            for title in set(match_result.titles): # only loop once per title in match_result
-                if title in unique_suggestions:
-                    entry = unique_suggestions[title]
-                    entry['match_job_ids'].add(match_result.job_id)
-                    entry['sources'].add(match_result.source)
-                    entry['origins_count'] += 1
-                    # if new result has lower hop level, and score is close enough to original score, then only update min_hop
-                    if match_result.hop_level < entry['min_hop']:
-                        if abs(match_result.score - entry['original_score']) <= CLOSENESS_ABS_DELTA:
-                            entry['min_hop'] = match_result.hop_level
-                            entry['original_score'] = match_result.score
-                    # This not really required but a safety check if results are not sorted properly.
-                    new_score = match_result._adjusted_score() * SCORE_REDUCTION_FACTOR
-                    entry['adjusted_score'] = max(entry['adjusted_score'], new_score)
-                else:
-                    unique_suggestions[title] = {
-                        # reduce score since it's from one index only
-                        'adjusted_score': match_result._adjusted_score() * SCORE_REDUCTION_FACTOR,
-                        'original_score': match_result.score,
-                        'match_job_ids' : {match_result.job_id},
-                        'hop_level'     : match_result.hop_level,
-                        'min_hop'       : match_result.hop_level,
-                        'sources'       : {match_result.source},
-                        'origins_count' : 1
-                    }
-
-        return unique_suggestions
+        with metrics.STAGE_SECONDS.labels("merged_suggestions").time():
+            suggestions = merge_vector_results(skill_suggestions, responsibilities_suggestions)
+        if len(suggestions) == 0:
+            metrics.EMPTY_SUGGESTIONS.labels("no_common_titles").inc()
+        metrics.SUGGESTIONS.observe(len(suggestions))
+        return suggestions
 
 
 """
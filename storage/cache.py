@@ -0,0 +1,142 @@
+from collections import OrderedDict
+import sqlite3
+import threading
+import time
+
+class LRUCache:
+    """Thread-safe in-memory cache with size-based LRU eviction and an optional TTL"""
+
+    def __init__(self, max_size: int, ttl_seconds: float | None = None):
+        self.__max_size = max_size
+        self.__ttl_seconds = ttl_seconds
+        self.__entries: OrderedDict = OrderedDict()
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self.__entries[key]
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value):
+        if self.__max_size <= 0:
+            return
+        expires_at = None if self.__ttl_seconds is None else time.monotonic() + self.__ttl_seconds
+        with self.__lock:
+            self.__entries[key] = (value, expires_at)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self):
+        return len(self.__entries)
+
+
+class DiskCache:
+    """
+        Persistent key/bytes store backed by sqlite, shared by every process that opens the same path.
+        Entries older than `ttl_seconds` are treated as missing and removed on reads and writes.
+        With `max_rows` set, writes evict the oldest entries beyond that many. Eviction runs
+        once per tenth of `max_rows` rows written, so the table can overshoot by that much.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float | None = None, max_rows: int | None = None):
+        self.__ttl_seconds = ttl_seconds
+        self.__max_rows = max_rows
+        self.__prune_interval = max(1, max_rows // 10) if max_rows else 1000 # rows written between prunes
+        self.__written_since_prune = 0
+        self.__lock = threading.Lock()
+        self.__conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.__conn.execute("PRAGMA journal_mode=WAL")
+        self.__conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self.__conn.execute("CREATE INDEX IF NOT EXISTS cache_created_at ON cache (created_at)")
+        self.__conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        if len(keys) == 0:
+            return {}
+        found = {}
+        with self.__lock:
+            # stay below sqlite's host parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.__conn.execute(
+                    f"SELECT key, value, created_at FROM cache WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, value, created_at in rows:
+                    if self.__is_expired(created_at):
+                        self.__conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                        continue
+                    found[key] = value
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, entries: dict[str, bytes]):
+        if len(entries) == 0:
+            return
+        now = time.time()
+        with self.__lock:
+            self.__conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, created_at) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in entries.items()]
+            )
+            self.__written_since_prune += len(entries)
+            if self.__written_since_prune >= self.__prune_interval:
+                self.__written_since_prune = 0
+                self.__prune(now)
+
+    def delete_created_before(self, created_at: float):
+        with self.__lock:
+            self.__conn.execute("DELETE FROM cache WHERE created_at < ?", (created_at,))
+
+    def get_counter(self, name: str) -> int:
+        """Counters never expire and are shared by every process using the same file"""
+        with self.__lock:
+            row = self.__conn.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()
+        return 0 if row is None else row[0]
+
+    def increment_counter(self, name: str) -> int:
+        with self.__lock:
+            self.__conn.execute(
+                "INSERT INTO counters (name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+                (name,)
+            )
+            return self.__conn.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()[0]
+
+    def __prune(self, now: float):
+        if self.__ttl_seconds is not None:
+            self.__conn.execute("DELETE FROM cache WHERE created_at < ?", (now - self.__ttl_seconds,))
+        if self.__max_rows is None:
+            return
+        rows = self.__conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if rows > self.__max_rows:
+            self.__conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY created_at LIMIT ?)",
+                (rows - self.__max_rows,)
+            )
+
+    def __is_expired(self, created_at: float) -> bool:
+        return self.__ttl_seconds is not None and created_at + self.__ttl_seconds < time.time()
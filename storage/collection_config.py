@@ -0,0 +1,113 @@
+from qdrant_client import AsyncQdrantClient, models
+from configs.configs import configs
+import logging
+
+def build_vector_params(vector_config: models.VectorParams) -> models.VectorParams:
+    """Vector params tuned from Configs: HNSW graph, quantization and on-disk storage"""
+    return models.VectorParams(
+        size=vector_config.size,
+        distance=vector_config.distance,
+        on_disk=configs.is_vectors_on_disk(),
+        hnsw_config=build_hnsw_config(),
+        quantization_config=build_quantization_config()
+    )
+
+def build_hnsw_config() -> models.HnswConfigDiff:
+    return models.HnswConfigDiff(
+        m=configs.get_hnsw_m(),
+        ef_construct=configs.get_hnsw_ef_construct(),
+        on_disk=configs.is_hnsw_on_disk()
+    )
+
+def build_quantization_config() -> models.QuantizationConfig | None:
+    quantization = configs.get_quantization()
+    if quantization is None:
+        return None
+    if quantization == "int8":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=configs.is_quantization_always_ram()
+            )
+        )
+    if quantization == "binary":
+        return models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=configs.is_quantization_always_ram())
+        )
+    raise ValueError(f"Unknown quantization '{quantization}', expected None, 'int8' or 'binary'")
+
+def build_optimizers_config() -> models.OptimizersConfigDiff | None:
+    optimizers_config = configs.get_optimizers_config()
+    return models.OptimizersConfigDiff(**optimizers_config) if optimizers_config else None
+
+def build_search_params() -> models.SearchParams:
+    """Search-time HNSW ef and quantization rescoring/oversampling"""
+    quantization = None
+    if configs.get_quantization() is not None:
+        quantization = models.QuantizationSearchParams(
+            rescore=configs.is_quantization_rescore_enabled(),
+            oversampling=configs.get_quantization_oversampling()
+        )
+    return models.SearchParams(hnsw_ef=configs.get_hnsw_ef_search(), quantization=quantization)
+
+async def apply_collection_config(
+        client: AsyncQdrantClient,
+        collection_name: str,
+        vector_name: str,
+        vector_params: models.VectorParams):
+    """
+        Bring an existing collection in line with `vector_params` and the optimizers config.
+        Only settings that differ are sent, so running it repeatedly is a no-op.
+    """
+    info = await client.get_collection(collection_name)
+    current = info.config.params.vectors[vector_name] # type: ignore
+
+    vector_diff = {}
+    if bool(current.on_disk) != bool(vector_params.on_disk):
+        vector_diff["on_disk"] = vector_params.on_disk
+    current_hnsw = current.hnsw_config or info.config.hnsw_config
+    desired_hnsw = vector_params.hnsw_config
+    if (current_hnsw.m, current_hnsw.ef_construct, bool(current_hnsw.on_disk)) != \
+            (desired_hnsw.m, desired_hnsw.ef_construct, bool(desired_hnsw.on_disk)): # type: ignore
+        vector_diff["hnsw_config"] = desired_hnsw
+    current_quantization = current.quantization_config or info.config.quantization_config
+    if _dump(current_quantization) != _dump(vector_params.quantization_config):
+        vector_diff["quantization_config"] = vector_params.quantization_config or models.Disabled.DISABLED
+
+    optimizers_diff = {
+        key: value
+        for key, value in configs.get_optimizers_config().items()
+        if getattr(info.config.optimizer_config, key, None) != value
+    }
+
+    if not vector_diff and not optimizers_diff:
+        logging.info(f"Collection '{collection_name}' already matches the configured tuning.")
+        return
+    logging.info(f"Updating collection '{collection_name}': vectors {list(vector_diff)}, optimizers {optimizers_diff}")
+    await client.update_collection(
+        collection_name=collection_name,
+        vectors_config={vector_name: models.VectorParamsDiff(**vector_diff)} if vector_diff else None,
+        optimizers_config=models.OptimizersConfigDiff(**optimizers_diff) if optimizers_diff else None
+    )
+
+async def apply_payload_indexes(client: AsyncQdrantClient, collection_name: str):
+    """
+        Create the configured PAYLOAD_INDEXES that the collection does not have yet.
+        Filtered searches use them to check conditions while traversing the HNSW graph.
+    """
+    info = await client.get_collection(collection_name)
+    existing = info.payload_schema or {}
+    for field_name, schema in configs.get_payload_indexes().items():
+        if field_name in existing:
+            continue
+        logging.info(f"Creating {schema} payload index '{field_name}' on '{collection_name}'")
+        await client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field_name,
+            field_schema=models.PayloadSchemaType(schema),
+            wait=True
+        )
+
+def _dump(config) -> dict | None:
+    return None if config is None else config.model_dump(exclude_none=True)
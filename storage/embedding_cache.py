@@ -0,0 +1,62 @@
+from storage.cache import DiskCache, LRUCache
+import hashlib
+import numpy as np
+
+class EmbeddingCache:
+    """
+        Embeddings keyed by a hash of the model name and the exact vector text.
+        An in-memory LRU sits in front of an optional sqlite tier that survives restarts.
+        Both tiers hold float32 vectors; a float32 array is a quarter of a list of Python floats.
+    """
+
+    def __init__(
+            self,
+            model_name: str,
+            max_size: int,
+            ttl_seconds: float | None = None,
+            disk_path: str | None = None,
+            disk_max_rows: int | None = None):
+        self.__model_name = model_name
+        self.__memory = LRUCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self.__disk = DiskCache(disk_path, ttl_seconds=ttl_seconds, max_rows=disk_max_rows) if disk_path else None
+
+    def get_many(self, texts: list[str]) -> list[np.ndarray | None]:
+        """Cached embeddings in the order of `texts`, None where missing"""
+        keys = [self.__key(text) for text in texts]
+        embeddings = [self.__memory.get(key) for key in keys]
+        if self.__disk is None:
+            return embeddings
+
+        missing_keys = [key for key, embedding in zip(keys, embeddings) if embedding is None]
+        stored = self.__disk.get_many(missing_keys)
+        for i, key in enumerate(keys):
+            if embeddings[i] is None and key in stored:
+                embeddings[i] = np.frombuffer(stored[key], dtype=np.float32)
+                self.__memory.set(key, embeddings[i])
+        return embeddings
+
+    def set_many(self, texts: list[str], embeddings: np.ndarray):
+        keys = [self.__key(text) for text in texts]
+        for key, embedding in zip(keys, embeddings):
+            # copy so a cached row does not keep the whole batch alive
+            self.__memory.set(key, np.array(embedding, dtype=np.float32))
+        if self.__disk is not None:
+            self.__disk.set_many({
+                key: np.asarray(embedding, dtype=np.float32).tobytes()
+                for key, embedding in zip(keys, embeddings)
+            })
+
+    def get_stats(self) -> dict:
+        stats = {
+            "memory_hits": self.__memory.hits,
+            "memory_misses": self.__memory.misses,
+            "memory_evictions": self.__memory.evictions,
+            "memory_size": len(self.__memory),
+        }
+        if self.__disk is not None:
+            stats["disk_hits"] = self.__disk.hits
+            stats["disk_misses"] = self.__disk.misses
+        return stats
+
+    def __key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.__model_name}\0{text}".encode("utf-8")).hexdigest()
@@ -0,0 +1,100 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import logging
+import numpy as np
+import os
+import tempfile
+
+_model = None
+
+def _init_worker(model_name: str, backend: str, threads: int, share_weights: bool):
+    global _model
+    import torch
+    torch.set_num_threads(threads)
+    if share_weights:
+        from storage import embedding_worker_preload
+        _model = embedding_worker_preload.model
+    else:
+        from storage.vectorizer import load_model
+        _model = load_model(model_name, backend, threads)
+
+def _get_dimension() -> int:
+    return _model.get_sentence_embedding_dimension() # type: ignore
+
+def _encode_into(path: str, shape: tuple[int, int], rows: list[int], texts: list[str], batch_size: int) -> int:
+    """Encode `texts` and write them straight into `rows` of the shared output buffer"""
+    output = np.memmap(path, dtype=np.float32, mode="r+", shape=shape)
+    output[rows] = _model.encode(texts, batch_size=batch_size) # type: ignore
+    del output
+    return len(rows)
+
+
+class EmbeddingWorkerPool:
+    """
+        Runs `worker_count` model processes that receive batches over the executor's call queue.
+
+        Workers write embeddings directly into a shared-memory file, and the caller gets a
+        NumPy array mapped onto that memory, so results are never pickled or turned into lists.
+        With `share_weights` the torch model is loaded once in a forkserver and workers inherit it.
+        ONNX backends always load per worker: an ONNX Runtime session sizes its thread pool
+        when it is created, so it must be built in the worker with `threads_per_worker`.
+    """
+
+    def __init__(
+            self,
+            worker_count: int,
+            model_name: str,
+            backend: str,
+            threads_per_worker: int | None = None,
+            share_weights: bool = True):
+        threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // worker_count)
+        if share_weights and backend != "torch":
+            logging.info(f"Weight sharing is not supported with the '{backend}' backend, each worker loads its own model")
+            share_weights = False
+        context = multiprocessing.get_context("forkserver")
+        if share_weights:
+            context.set_forkserver_preload(["storage.embedding_worker_preload"])
+        self.__executor = ProcessPoolExecutor(
+            max_workers=worker_count,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(model_name, backend, threads_per_worker, share_weights)
+        )
+        self.__worker_count = worker_count
+        self.__dimension = self.__executor.submit(_get_dimension).result()
+        # /dev/shm keeps the output buffers in memory on linux
+        self.__buffer_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+    def get_dimension(self) -> int:
+        return self.__dimension
+
+    def encode(self, texts: list[str], batch_size: int) -> np.ndarray:
+        """Embeddings as a (len(texts), dimension) float32 array in the order of `texts`"""
+        if len(texts) == 0:
+            return np.empty((0, self.__dimension), dtype=np.float32)
+        shape = (len(texts), self.__dimension)
+        fd, path = tempfile.mkstemp(prefix="embeddings-", dir=self.__buffer_dir)
+        try:
+            try:
+                os.ftruncate(fd, shape[0] * shape[1] * np.dtype(np.float32).itemsize)
+            finally:
+                os.close(fd)
+            futures = [
+                self.__executor.submit(_encode_into, path, shape, rows, [texts[i] for i in rows], batch_size)
+                for rows in self.__split_rows(texts, batch_size)
+            ]
+            for future in futures:
+                future.result()
+            # the mapping stays valid after unlink and is released with the array
+            return np.memmap(path, dtype=np.float32, mode="r+", shape=shape)
+        finally:
+            os.unlink(path)
+
+    def close(self):
+        self.__executor.shutdown(wait=True, cancel_futures=True)
+
+    def __split_rows(self, texts: list[str], batch_size: int) -> list[list[int]]:
+        # length-sorted buckets, at least one per worker so every process gets work
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        bucket_size = max(1, min(batch_size, -(-len(texts) // self.__worker_count)))
+        return [order[start:start + bucket_size] for start in range(0, len(order), bucket_size)]
@@ -0,0 +1,10 @@
+"""
+    Imported once by the forkserver of EmbeddingWorkerPool when weight sharing is enabled.
+    Workers fork from the forkserver after this model is loaded, so its weights are
+    shared copy-on-write between all of them instead of being loaded once per worker.
+    Only used with the torch backend; workers set their torch thread count after forking.
+"""
+from configs.configs import configs
+from storage.vectorizer import load_model
+
+model = load_model(configs.get_embedding_model_name(), configs.get_embedding_backend())
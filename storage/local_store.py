@@ -0,0 +1,459 @@
+from qdrant_client import AsyncQdrantClient, models
+from qdrant_client.http.models import QueryResponse
+import asyncio
+import json
+import logging
+import numpy as np
+import os
+
+MISSING_CODE = -1 # keyword column value of rows without a string value
+MISSING_INTEGER = np.iinfo(np.int64).min # integer column value of rows without an integer value
+
+class LocalCollection:
+    """
+        Vectors of one collection held as contiguous, L2-normalized NumPy matrices
+        (one per vector name) with array-backed payload columns, searched exactly.
+
+        Fields listed in `payload_indexes` also get typed columns, like Qdrant payload
+        indexes: keywords as int32 codes into a per-field vocabulary, integers as int64.
+        Filters on them are vectorized. A field falls back to the object column once a
+        point stores a value of another type in it.
+    """
+
+    def __init__(self, vector_sizes: dict[str, int], dtype: str = "float32", payload_indexes: dict[str, str] | None = None):
+        self.vector_sizes = vector_sizes
+        self.dtype = np.dtype(dtype)
+        self.ids: list[str] = []
+        self.rows: dict[str, int] = {}
+        self.size = 0
+        self.vectors = {name: np.empty((0, dim), dtype=self.dtype) for name, dim in vector_sizes.items()}
+        self.payload_columns: dict[str, np.ndarray] = {}
+        self.payload_indexes = dict(payload_indexes or {})
+        self.keyword_columns = {
+            key: np.empty(0, dtype=np.int32) for key, schema in self.payload_indexes.items() if schema == "keyword"
+        }
+        self.keyword_vocabularies: dict[str, dict[str, int]] = {key: {} for key in self.keyword_columns}
+        self.integer_columns = {
+            key: np.empty(0, dtype=np.int64) for key, schema in self.payload_indexes.items() if schema == "integer"
+        }
+
+    def upsert(self, point_ids: list[str], vectors: dict[str, np.ndarray], payloads: list[dict]):
+        rows = np.array([self.__get_or_add_row(point_id) for point_id in point_ids], dtype=np.int64)
+        for name, block in vectors.items():
+            self.vectors[name][rows] = _normalize(block)
+        for row, payload in zip(rows, payloads):
+            for column in self.payload_columns.values():
+                column[row] = None
+            for column in self.keyword_columns.values():
+                column[row] = MISSING_CODE
+            for column in self.integer_columns.values():
+                column[row] = MISSING_INTEGER
+            self.set_payload(int(row), payload)
+
+    def set_payload(self, row: int, payload: dict):
+        for key, value in payload.items():
+            if key not in self.payload_columns:
+                self.payload_columns[key] = np.full(self.__capacity(), None, dtype=object)
+            self.payload_columns[key][row] = value
+            if key in self.keyword_columns:
+                self.__set_keyword(key, row, value)
+            elif key in self.integer_columns:
+                self.__set_integer(key, row, value)
+
+    def get_payload(self, row: int) -> dict:
+        return {
+            key: column[row]
+            for key, column in self.payload_columns.items()
+            if column[row] is not None
+        }
+
+    def get_vectors(self, row: int) -> dict[str, list[float]]:
+        return {name: matrix[row].astype(np.float32).tolist() for name, matrix in self.vectors.items()}
+
+    def search(
+            self,
+            vector_name: str,
+            queries: np.ndarray,
+            limit: int,
+            score_threshold: float | None = None,
+            query_filter: models.Filter | None = None) -> list[list[tuple[int, float]]]:
+        """
+            Exact cosine top-k as (row, score) pairs per query, best first.
+            All queries are scored with one matrix product. Safe to run off the event loop
+            while upserts continue: rows added after the search starts are not seen.
+        """
+        size = self.size
+        mask = None if query_filter is None else self.filter_mask(query_filter, size)
+        candidates = size if mask is None else int(mask.sum())
+        if candidates == 0:
+            return [[] for _ in queries]
+        matrix = self.vectors[vector_name][:size]
+        # float16 matrices are upcast here, trading search time for half the memory
+        scores = matrix @ _normalize(queries).T # (size, queries)
+        if mask is not None:
+            scores[~mask] = -np.inf
+        k = min(limit, candidates)
+        top = np.argpartition(-scores, k - 1, axis=0)[:k] # (k, queries)
+        top_scores = np.take_along_axis(scores, top, axis=0)
+        order = np.argsort(-top_scores, axis=0, kind="stable")
+        top = np.take_along_axis(top, order, axis=0).T.tolist()
+        top_scores = np.take_along_axis(top_scores, order, axis=0).T.tolist()
+        return [
+            [
+                (row, score) for row, score in zip(rows, row_scores)
+                if score_threshold is None or score >= score_threshold
+            ]
+            for rows, row_scores in zip(top, top_scores)
+        ]
+
+    def filter_mask(self, query_filter: models.Filter, size: int | None = None) -> np.ndarray:
+        """Rows matching the filter, for the must/must_not conditions that build_filter creates"""
+        size = self.size if size is None else size
+        mask = np.ones(size, dtype=bool)
+        for condition in _as_list(query_filter.must):
+            mask &= self.__condition_mask(condition, size)
+        for condition in _as_list(query_filter.must_not):
+            mask &= ~self.__condition_mask(condition, size)
+        if query_filter.should:
+            raise NotImplementedError("LocalVectorStore does not support 'should' filters")
+        return mask
+
+    def __condition_mask(self, condition, size: int) -> np.ndarray:
+        if not isinstance(condition, models.FieldCondition):
+            raise NotImplementedError(f"LocalVectorStore does not support {type(condition).__name__} filters")
+        column = self.payload_columns.get(condition.key)
+        if column is None:
+            return np.zeros(size, dtype=bool)
+        if condition.key in self.keyword_columns and isinstance(condition.match, (models.MatchAny, models.MatchValue)):
+            return self.__keyword_mask(condition, size)
+        if condition.key in self.integer_columns:
+            mask = self.__integer_mask(condition, size)
+            if mask is not None:
+                return mask
+        values = column[:size]
+        if isinstance(condition.match, models.MatchAny):
+            allowed = set(condition.match.any) # type: ignore
+            return np.fromiter((_matches_any(value, allowed) for value in values), dtype=bool, count=size)
+        if isinstance(condition.match, models.MatchValue):
+            allowed = {condition.match.value}
+            return np.fromiter((_matches_any(value, allowed) for value in values), dtype=bool, count=size)
+        if condition.range is not None:
+            bounds = condition.range
+            return np.fromiter((_in_range(value, bounds) for value in values), dtype=bool, count=size)
+        raise NotImplementedError(f"LocalVectorStore does not support the filter on '{condition.key}'")
+
+    def __keyword_mask(self, condition: models.FieldCondition, size: int) -> np.ndarray:
+        allowed = condition.match.any if isinstance(condition.match, models.MatchAny) else [condition.match.value] # type: ignore
+        vocabulary = self.keyword_vocabularies[condition.key]
+        codes = [vocabulary[value] for value in allowed if isinstance(value, str) and value in vocabulary]
+        return np.isin(self.keyword_columns[condition.key][:size], codes)
+
+    def __integer_mask(self, condition: models.FieldCondition, size: int) -> np.ndarray | None:
+        values = self.integer_columns[condition.key][:size]
+        if isinstance(condition.match, models.MatchAny):
+            allowed = [value for value in condition.match.any if isinstance(value, int) and not isinstance(value, bool)] # type: ignore
+            return np.isin(values, allowed)
+        if isinstance(condition.match, models.MatchValue):
+            value = condition.match.value
+            return values == value if isinstance(value, int) and not isinstance(value, bool) else np.zeros(size, dtype=bool)
+        if condition.range is not None:
+            bounds = condition.range
+            mask = values != MISSING_INTEGER
+            if bounds.lt is not None:
+                mask &= values < bounds.lt
+            if bounds.lte is not None:
+                mask &= values <= bounds.lte
+            if bounds.gt is not None:
+                mask &= values > bounds.gt
+            if bounds.gte is not None:
+                mask &= values >= bounds.gte
+            return mask
+        return None
+
+    def __set_keyword(self, key: str, row: int, value):
+        if value is None:
+            self.keyword_columns[key][row] = MISSING_CODE
+        elif isinstance(value, str):
+            vocabulary = self.keyword_vocabularies[key]
+            self.keyword_columns[key][row] = vocabulary.setdefault(value, len(vocabulary))
+        else:
+            # lists and other types are matched on the object column
+            del self.keyword_columns[key], self.keyword_vocabularies[key]
+
+    def __set_integer(self, key: str, row: int, value):
+        if value is None:
+            self.integer_columns[key][row] = MISSING_INTEGER
+        elif isinstance(value, int) and not isinstance(value, bool) and value != MISSING_INTEGER:
+            self.integer_columns[key][row] = value
+        else:
+            del self.integer_columns[key]
+
+    def snapshot(self, directory: str):
+        """
+            Files are written under temporary names and renamed into place, since the
+            vectors may still be memory-mapped from the snapshot being replaced.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name, matrix in self.vectors.items():
+            path = os.path.join(directory, f"vectors.{name}.npy")
+            with open(f"{path}.tmp", "wb") as vectors_file:
+                np.save(vectors_file, matrix[:self.size])
+            os.replace(f"{path}.tmp", path)
+        path = os.path.join(directory, "points.json")
+        with open(f"{path}.tmp", "w") as points_file:
+            json.dump({
+                "vector_sizes": self.vector_sizes,
+                "dtype": self.dtype.name,
+                "ids": self.ids,
+                "payloads": [self.get_payload(row) for row in range(self.size)],
+            }, points_file)
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load(cls, directory: str, payload_indexes: dict[str, str] | None = None) -> "LocalCollection":
+        """Vectors are memory-mapped read-only and copied into memory on the first write"""
+        with open(os.path.join(directory, "points.json")) as points_file:
+            points = json.load(points_file)
+        collection = cls(points["vector_sizes"], points["dtype"], payload_indexes)
+        collection.ids = points["ids"]
+        collection.rows = {point_id: row for row, point_id in enumerate(collection.ids)}
+        collection.size = len(collection.ids)
+        for name in collection.vector_sizes:
+            collection.vectors[name] = np.load(os.path.join(directory, f"vectors.{name}.npy"), mmap_mode="r")
+        for key in collection.keyword_columns:
+            collection.keyword_columns[key] = np.full(collection.size, MISSING_CODE, dtype=np.int32)
+        for key in collection.integer_columns:
+            collection.integer_columns[key] = np.full(collection.size, MISSING_INTEGER, dtype=np.int64)
+        for row, payload in enumerate(points["payloads"]):
+            collection.set_payload(row, payload)
+        return collection
+
+    def __get_or_add_row(self, point_id: str) -> int:
+        row = self.rows.get(point_id)
+        if row is not None:
+            self.__ensure_writable(self.size)
+            return row
+        row = self.size
+        self.__ensure_writable(row + 1)
+        self.ids.append(point_id)
+        self.rows[point_id] = row
+        self.size += 1
+        return row
+
+    def __ensure_writable(self, rows_needed: int):
+        capacity = self.__capacity()
+        writable = all(matrix.flags.writeable for matrix in self.vectors.values())
+        if rows_needed <= capacity and writable:
+            return
+        new_capacity = max(rows_needed, capacity * 2, 16)
+        for name, matrix in self.vectors.items():
+            grown = np.zeros((new_capacity, self.vector_sizes[name]), dtype=self.dtype)
+            grown[:self.size] = matrix[:self.size]
+            self.vectors[name] = grown
+        for key, column in self.payload_columns.items():
+            grown_column = np.full(new_capacity, None, dtype=object)
+            grown_column[:len(column)] = column
+            self.payload_columns[key] = grown_column
+        for key, column in self.keyword_columns.items():
+            grown_column = np.full(new_capacity, MISSING_CODE, dtype=np.int32)
+            grown_column[:len(column)] = column
+            self.keyword_columns[key] = grown_column
+        for key, column in self.integer_columns.items():
+            grown_column = np.full(new_capacity, MISSING_INTEGER, dtype=np.int64)
+            grown_column[:len(column)] = column
+            self.integer_columns[key] = grown_column
+
+    def __capacity(self) -> int:
+        return len(next(iter(self.vectors.values())))
+
+
+class LocalVectorStore:
+    """
+        In-process stand-in for the subset of AsyncQdrantClient used by vector_store.
+
+        Useful for dev, tests and small tenants: searches are exact and never leave the
+        process. They run in a worker thread so the event loop keeps serving requests.
+        Collections can be snapshotted to and loaded from memory-mapped files, and filled
+        from a Qdrant server with `sync_from_qdrant`.
+    """
+
+    def __init__(self, dtype: str = "float32", payload_indexes: dict[str, str] | None = None):
+        self.__dtype = dtype
+        self.__payload_indexes = payload_indexes # field -> keyword | integer, filtered on typed columns
+        self.__collections: dict[str, LocalCollection] = {}
+
+    async def collection_exists(self, collection_name: str) -> bool:
+        return collection_name in self.__collections
+
+    async def get_collections(self) -> models.CollectionsResponse:
+        return models.CollectionsResponse(
+            collections=[models.CollectionDescription(name=name) for name in self.__collections]
+        )
+
+    async def get_aliases(self) -> models.CollectionsAliasesResponse:
+        return models.CollectionsAliasesResponse(aliases=[])
+
+    async def create_collection(self, collection_name: str, vectors_config: dict, **kwargs) -> bool:
+        # HNSW, quantization and optimizer settings do not apply to exact search
+        self.__collections[collection_name] = LocalCollection(
+            {name: params.size for name, params in vectors_config.items()},
+            self.__dtype,
+            self.__payload_indexes
+        )
+        return True
+
+    async def upsert(self, collection_name: str, points: list[models.PointStruct], **kwargs):
+        if len(points) == 0:
+            return
+        collection = self.__collections[collection_name]
+        vectors = {
+            name: np.array([point.vector[name] for point in points], dtype=np.float32) # type: ignore
+            for name in collection.vector_sizes
+        }
+        collection.upsert([str(point.id) for point in points], vectors, [point.payload or {} for point in points])
+
+    async def retrieve(
+            self,
+            collection_name: str,
+            ids: list,
+            with_payload: bool = True,
+            with_vectors: bool = False,
+            **kwargs) -> list[models.Record]:
+        collection = self.__collections[collection_name]
+        rows = [collection.rows[str(point_id)] for point_id in ids if str(point_id) in collection.rows]
+        return [self.__to_record(collection, row, with_payload, with_vectors) for row in rows]
+
+    async def scroll(
+            self,
+            collection_name: str,
+            limit: int = 10,
+            offset=None,
+            with_payload: bool = True,
+            with_vectors: bool = False,
+            **kwargs) -> tuple[list[models.Record], str | None]:
+        # offsets are row numbers, stable because rows are never removed
+        collection = self.__collections[collection_name]
+        start = int(offset or 0)
+        end = min(start + limit, collection.size)
+        records = [self.__to_record(collection, row, with_payload, with_vectors) for row in range(start, end)]
+        return records, (str(end) if end < collection.size else None)
+
+    async def batch_update_points(self, collection_name: str, update_operations: list, **kwargs):
+        collection = self.__collections[collection_name]
+        for operation in update_operations:
+            if not isinstance(operation, models.SetPayloadOperation):
+                raise NotImplementedError(f"LocalVectorStore does not support {type(operation).__name__}")
+            for point_id in operation.set_payload.points or []:
+                row = collection.rows.get(str(point_id))
+                if row is not None:
+                    collection.set_payload(row, operation.set_payload.payload)
+
+    async def query_batch_points(self, collection_name: str, requests: list[models.QueryRequest], **kwargs) -> list[QueryResponse]:
+        searches = [
+            (request.using, request.query, request.limit, request.score_threshold, request.filter, request.with_payload)
+            for request in requests
+        ]
+        return [QueryResponse(points=points) for points in await asyncio.to_thread(self.__search, collection_name, searches)]
+
+    async def close(self, **kwargs):
+        pass
+
+    def snapshot(self, directory: str):
+        for name, collection in self.__collections.items():
+            collection.snapshot(os.path.join(directory, name))
+        logging.info(f"Snapshotted {len(self.__collections)} local collections to {directory}")
+
+    def load(self, directory: str):
+        for name in sorted(os.listdir(directory)):
+            if os.path.exists(os.path.join(directory, name, "points.json")):
+                self.__collections[name] = LocalCollection.load(os.path.join(directory, name), self.__payload_indexes)
+        logging.info(f"Loaded local collections {list(self.__collections)} from {directory}")
+
+    async def sync_from_qdrant(self, client: AsyncQdrantClient, collection_name: str, page_size: int = 1024) -> int:
+        """Copy every point of a Qdrant collection into the local collection of the same name"""
+        info = await client.get_collection(collection_name)
+        vectors_config = info.config.params.vectors
+        await self.create_collection(collection_name, vectors_config) # type: ignore
+        synced = 0
+        offset = None
+        while True:
+            records, offset = await client.scroll(
+                collection_name=collection_name,
+                limit=page_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            await self.upsert(collection_name, [
+                models.PointStruct(id=record.id, vector=record.vector, payload=record.payload) # type: ignore
+                for record in records
+            ])
+            synced += len(records)
+            if offset is None:
+                break
+        logging.info(f"Synced {synced} points of '{collection_name}' from Qdrant")
+        return synced
+
+    def __search(self, collection_name: str, searches: list[tuple]) -> list[list[models.ScoredPoint]]:
+        """
+            Searches as (vector name, vector, limit, score threshold, filter, with_payload).
+            Searches that share everything but the vector run as one matrix product.
+        """
+        collection = self.__collections[collection_name]
+        groups: dict[tuple, list[int]] = {}
+        for i, (vector_name, _, limit, score_threshold, query_filter, _) in enumerate(searches):
+            filter_key = None if query_filter is None else query_filter.model_dump_json()
+            groups.setdefault((vector_name, limit, score_threshold, filter_key), []).append(i)
+
+        results: list[list[models.ScoredPoint]] = [[] for _ in searches]
+        for indices in groups.values():
+            vector_name, _, limit, score_threshold, query_filter, _ = searches[indices[0]]
+            queries = np.array([searches[i][1] for i in indices], dtype=np.float32)
+            for i, matches in zip(indices, collection.search(vector_name, queries, limit, score_threshold, query_filter)):
+                with_payload = searches[i][5]
+                results[i] = [
+                    models.ScoredPoint(
+                        id=collection.ids[row], version=0, score=score, payload=_select_payload(collection.get_payload(row), with_payload)
+                    )
+                    for row, score in matches
+                ]
+        return results
+
+    def __to_record(self, collection: LocalCollection, row: int, with_payload: bool, with_vectors: bool) -> models.Record:
+        return models.Record(
+            id=collection.ids[row],
+            payload=collection.get_payload(row) if with_payload else None,
+            vector=collection.get_vectors(row) if with_vectors else None
+        )
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+def _select_payload(payload: dict, with_payload) -> dict | None:
+    if isinstance(with_payload, models.PayloadSelectorInclude):
+        return {key: value for key, value in payload.items() if key in with_payload.include}
+    return payload if with_payload else None
+
+def _as_list(conditions) -> list:
+    if conditions is None:
+        return []
+    return conditions if isinstance(conditions, list) else [conditions]
+
+def _matches_any(value, allowed: set) -> bool:
+    # like Qdrant, a list payload matches when any of its elements does
+    if isinstance(value, list):
+        return any(element in allowed for element in value)
+    return value is not None and value in allowed
+
+def _in_range(value, bounds: models.Range) -> bool:
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return False
+    return (
+        (bounds.lt is None or value < bounds.lt)
+        and (bounds.lte is None or value <= bounds.lte)
+        and (bounds.gt is None or value > bounds.gt)
+        and (bounds.gte is None or value >= bounds.gte)
+    )
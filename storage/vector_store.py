@@ -1,7 +1,17 @@
 from dataclasses import dataclass
-from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+from qdrant_client.models import (
+    FieldCondition, Filter, MatchAny, PayloadSelectorInclude, PointStruct, QueryRequest, Range, SetPayload,
+    SetPayloadOperation
+)
 from storage.vectorizer import Vectorizer
+from storage import collection_config
+from storage.local_store import LocalVectorStore
+from configs.configs import configs
+from monitoring import metrics
+import asyncio
+import httpx
 import logging
 
 @dataclass
@@ -9,91 +19,328 @@ class VectorItem:
     item_id: str
     text: str
     metadata: dict
+    vector: list[float] | None = None
 
-def create_collection_if_not_exists(
-        client: QdrantClient, 
+DEFAULT_VECTOR_NAME = "default" # the single vector of split-layout collections
+SKILLS_VECTOR_NAME = "skills"
+RESPONSIBILITIES_VECTOR_NAME = "responsibilities"
+# searches only return what suggestions are built from, not the stored source fields
+SEARCH_PAYLOAD = PayloadSelectorInclude(include=["job_id", "titles", "hop_level", "source"])
+
+_local_store: LocalVectorStore | None = None
+_shared_client: AsyncQdrantClient | None = None
+
+def create_client() -> AsyncQdrantClient:
+    """Client for the configured VECTOR_BACKEND. The local backend is one store shared by every caller."""
+    global _local_store
+    if configs.is_local_vector_backend():
+        if _local_store is None:
+            _local_store = LocalVectorStore(
+                dtype=configs.get_local_store_dtype(),
+                payload_indexes=configs.get_payload_indexes()
+            )
+        return _local_store # type: ignore
+    # keep-alive connections are reused across requests instead of reconnecting per call
+    return AsyncQdrantClient(
+        configs.get_qdrant_url(),
+        limits=httpx.Limits(
+            max_connections=configs.get_qdrant_max_connections(),
+            max_keepalive_connections=configs.get_qdrant_max_keepalive_connections()
+        )
+    )
+
+def get_shared_client() -> AsyncQdrantClient:
+    """The process-wide client that the API services share"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = create_client()
+    return _shared_client
+
+async def close_shared_client():
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.close()
+        _shared_client = None
+
+def get_local_store() -> LocalVectorStore | None:
+    return _local_store
+
+async def create_collection_if_not_exists(
+        client: AsyncQdrantClient, 
         vectorizer: Vectorizer, 
-        collection_name: str):
-    """Create a Qdrant collection if it does not already exist"""
-    existing_collections = client.get_collections().collections
-    if any(col.name == collection_name for col in existing_collections):
+        collection_name: str,
+        vector_names: tuple[str, ...] = (DEFAULT_VECTOR_NAME,)):
+    """
+        Create a Qdrant collection if it does not already exist.
+        Existing collections get the configured HNSW, quantization and optimizer settings applied.
+    """
+    vector_params = collection_config.build_vector_params(vectorizer.get_vector_config())
+    if await collection_exists(client, collection_name):
         logging.info(f"Collection '{collection_name}' already exists.")
-        return  # Collection already exists
+        if isinstance(client, LocalVectorStore):
+            return # exact search has nothing to tune
+        for vector_name in vector_names:
+            await collection_config.apply_collection_config(client, collection_name, vector_name, vector_params)
+        await collection_config.apply_payload_indexes(client, collection_name)
+        return
     logging.info(f"Creating collection '{collection_name}'.")
-    client.recreate_collection(
+    await client.create_collection(
         collection_name=collection_name,
-        vectors_config={"default": vectorizer.get_vector_config()}
+        vectors_config={vector_name: vector_params for vector_name in vector_names},
+        optimizers_config=collection_config.build_optimizers_config()
     )
+    if not isinstance(client, LocalVectorStore):
+        await collection_config.apply_payload_indexes(client, collection_name)
+
+async def collection_exists(client: AsyncQdrantClient, name: str) -> bool:
+    """True when `name` is a collection or an alias pointing to one"""
+    if await client.collection_exists(name):
+        return True
+    aliases = (await client.get_aliases()).aliases
+    return any(alias.alias_name == name for alias in aliases)
 
-def insert_items(
-        client: QdrantClient, 
+def get_configured_collection_names() -> list[str]:
+    if configs.is_combined_storage_layout():
+        return [configs.get_jobs_collection_name()]
+    return [configs.get_skills_collection_name(), configs.get_responsibilities_collection_name()]
+
+async def create_configured_collections(client: AsyncQdrantClient, vectorizer: Vectorizer):
+    """Create or tune the collections of the configured STORAGE_LAYOUT"""
+    if configs.is_combined_storage_layout():
+        await create_collection_if_not_exists(
+            client = client,
+            vectorizer = vectorizer,
+            collection_name = configs.get_jobs_collection_name(),
+            vector_names = (SKILLS_VECTOR_NAME, RESPONSIBILITIES_VECTOR_NAME)
+        )
+        return
+    await create_collection_if_not_exists(
+        client = client,
+        vectorizer = vectorizer,
+        collection_name = configs.get_skills_collection_name()
+    )
+    await create_collection_if_not_exists(
+        client = client,
+        vectorizer = vectorizer,
+        collection_name = configs.get_responsibilities_collection_name()
+    )
+
+class UpsertPipeline:
+    """
+        Runs upserts in the background so the caller can embed the next chunk meanwhile.
+        `submit` blocks once `max_in_flight` writes are pending, which bounds memory.
+    """
+
+    def __init__(
+            self,
+            client: AsyncQdrantClient,
+            max_in_flight: int | None = None,
+            wait: bool | None = None):
+        self.__client = client
+        self.__wait = configs.get_upsert_wait() if wait is None else wait
+        self.__semaphore = asyncio.Semaphore(max_in_flight or configs.get_upsert_max_in_flight())
+        self.__tasks: set[asyncio.Task] = set()
+        self.__failure: BaseException | None = None # first failed write, raised by submit/drain
+        self.upserted_points = 0
+
+    async def submit(self, collection_name: str, points: list[PointStruct]):
+        if len(points) == 0:
+            return
+        await self.__semaphore.acquire()
+        if self.__failure is not None:
+            self.__semaphore.release()
+            await self.__cancel_and_raise()
+        task = asyncio.create_task(self.__upsert(collection_name, points))
+        self.__tasks.add(task)
+        task.add_done_callback(self.__on_done)
+
+    async def drain(self):
+        """Wait for every pending write. On a failure the remaining writes are cancelled and it is raised"""
+        if len(self.__tasks) > 0:
+            await asyncio.wait(self.__tasks, return_when=asyncio.FIRST_EXCEPTION)
+        if self.__failure is not None:
+            await self.__cancel_and_raise()
+
+    async def __upsert(self, collection_name: str, points: list[PointStruct]):
+        await upsert_points(self.__client, collection_name, points, wait=self.__wait)
+        self.upserted_points += len(points)
+
+    def __on_done(self, task: asyncio.Task):
+        self.__semaphore.release()
+        self.__tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None and self.__failure is None:
+            self.__failure = task.exception()
+
+    async def __cancel_and_raise(self):
+        pending = list(self.__tasks)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        raise self.__failure # type: ignore
+
+async def upsert_points(
+        client: AsyncQdrantClient, 
+        collection_name: str, 
+        points: list[PointStruct],
+        wait: bool = True):
+    """Upsert points, retrying transient failures with exponential backoff"""
+    max_retries = configs.get_upsert_max_retries()
+    for attempt in range(max_retries + 1):
+        try:
+            with metrics.QDRANT_CALL_SECONDS.labels("upsert", collection_name).time():
+                await client.upsert(
+                    collection_name=collection_name,
+                    points=points,
+                    wait=wait
+                )
+            metrics.POINTS_UPSERTED.labels(collection_name).inc(len(points))
+            return
+        except (ResponseHandlingException, UnexpectedResponse) as error:
+            if not _is_transient(error) or attempt == max_retries:
+                raise
+            delay = configs.get_upsert_retry_backoff_seconds() * (2 ** attempt)
+            logging.warning(f"Upsert of {len(points)} points into '{collection_name}' failed ({error}), retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code == 429 or error.status_code >= 500
+    return True # connection level failures
+
+def to_point(item: VectorItem) -> PointStruct:
+    return PointStruct(
+        id = item.item_id,
+        vector = {DEFAULT_VECTOR_NAME: item.vector},
+        payload = item.metadata
+    )
+
+def to_combined_point(skills_item: VectorItem, responsibilities_item: VectorItem) -> PointStruct:
+    """One point carrying both named vectors, for the combined storage layout"""
+    return PointStruct(
+        id = skills_item.item_id,
+        vector = {
+            SKILLS_VECTOR_NAME: skills_item.vector,
+            RESPONSIBILITIES_VECTOR_NAME: responsibilities_item.vector
+        },
+        payload = skills_item.metadata
+    )
+
+async def insert_items(
+        client: AsyncQdrantClient, 
         collection_name: str, 
         vectorizer: Vectorizer, 
         items: list[VectorItem]):
-    """Insert an item into the specified Qdrant collection"""
-    points = [
-        PointStruct(
-            id = item.item_id,
-            vector = {"default": vectorizer.generate_embedding(item.text)},
-            payload = item.metadata
+    """
+        Insert items into the specified Qdrant collection.
+
+        Items are written in chunks of UPSERT_CHUNK_SIZE. Items without a precomputed
+        vector are embedded chunk by chunk while the previous chunk is being written.
+    """
+    pipeline = UpsertPipeline(client)
+    chunk_size = configs.get_upsert_chunk_size()
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        pending = [item for item in chunk if item.vector is None]
+        embeddings = await vectorizer.generate_embeddings_async([item.text for item in pending])
+        for item, embedding in zip(pending, embeddings):
+            item.vector = embedding
+        await pipeline.submit(collection_name, [to_point(item) for item in chunk])
+    await pipeline.drain()
+
+async def retrieve_existing_ids(
+        client: AsyncQdrantClient, 
+        collection_name: str, 
+        item_ids: list[str]) -> set[str]:
+    """Ids from `item_ids` that already exist in the collection, looked up in one request"""
+    if len(item_ids) == 0:
+        return set()
+    with metrics.QDRANT_CALL_SECONDS.labels("retrieve", collection_name).time():
+        records = await client.retrieve(
+            collection_name=collection_name,
+            ids=item_ids,
+            with_payload=False,
+            with_vectors=False
         )
+    return {str(record.id) for record in records}
+
+async def update_payloads(
+        client: AsyncQdrantClient, 
+        collection_name: str, 
+        items: list[VectorItem]):
+    """Overwrite payload keys of existing points without touching their vectors"""
+    if len(items) == 0:
+        return
+    operations = [
+        SetPayloadOperation(set_payload=SetPayload(payload=item.metadata, points=[item.item_id]))
         for item in items
     ]
+    with metrics.QDRANT_CALL_SECONDS.labels("set_payload", collection_name).time():
+        await client.batch_update_points(
+            collection_name=collection_name,
+            update_operations=operations
+        )
+    metrics.PAYLOADS_UPDATED.labels(collection_name).inc(len(items))
 
-    client.upsert(
-        collection_name=collection_name,
-        points=points
-    )
+def build_filter(
+        sources: list[str] | None = None,
+        max_hop_level: int | None = None,
+        exclude_company_slugs: list[str] | None = None) -> Filter | None:
+    """
+        Payload filter for the search functions, None when nothing is restricted.
+        Qdrant applies it during graph traversal using the configured payload indexes.
+    """
+    must = []
+    must_not = []
+    if sources:
+        must.append(FieldCondition(key="source", match=MatchAny(any=list(sources))))
+    if max_hop_level is not None:
+        must.append(FieldCondition(key="hop_level", range=Range(lte=max_hop_level)))
+    if exclude_company_slugs:
+        must_not.append(FieldCondition(key="company_slug", match=MatchAny(any=list(exclude_company_slugs))))
+    if not must and not must_not:
+        return None
+    return Filter(must=must or None, must_not=must_not or None)
 
-def search_items(
-        client: QdrantClient, 
+async def search_named_vectors(
+        client: AsyncQdrantClient, 
         collection_name: str, 
-        vectorizer: Vectorizer, 
-        query_text: str, 
+        queries: list[tuple[str, list[float]]], 
         top_k: int,
-        score_threshold: float = 0.8) -> list[dict]: 
+        score_threshold: float = 0.8,
+        query_filter: Filter | None = None) -> list[list[dict]]:
     """
-        Search for items in the specified Qdrant collection.
-
-        Example output:
-        [
-            {
-                "id": "538bb680-3272-5c2b-bb73-f9dbe1fc292e",
-                "score": 0.82117903,
-                "payload": {
-                "titles": [
-                    "Solutions Consultant",
-                    "Advertising Solutions Consultant"
-                ],
-                "job_id": "68cfa0c0d13d747f4c34f4e6"
-                }
-            },
-            {
-                "id": "1f5cb9cb-bf4f-5d2b-a700-6cca4c06b1fb",
-                "score": 0.80463666,
-                "payload": {
-                "titles": [
-                    "Software Engineering Intern",
-                    "Web Development Intern"
-                ],
-                "job_id": "68bd7923808b484560386fa2"
-                }
-            }
-        ]
+        Search (vector name, query vector) pairs of one collection in a single batched query.
+        Split-layout collections have one vector, named DEFAULT_VECTOR_NAME.
+        Results are returned in query order.
     """
-    
-    query_vector = vectorizer.generate_embedding(query_text)
-    results = client.search(
-        collection_name=collection_name,
-        query_vector=("default", query_vector),
-        limit=top_k,
-        score_threshold=score_threshold
-    )
+    if len(queries) == 0:
+        return []
+    search_params = collection_config.build_search_params()
+    requests = [
+        QueryRequest(
+            query=query_vector,
+            using=vector_name,
+            filter=query_filter,
+            limit=top_k,
+            score_threshold=score_threshold,
+            with_payload=SEARCH_PAYLOAD,
+            params=search_params
+        )
+        for vector_name, query_vector in queries
+    ]
+    with metrics.QDRANT_CALL_SECONDS.labels("query_batch", collection_name).time():
+        responses = await client.query_batch_points(
+            collection_name=collection_name,
+            requests=requests
+        )
     return [
-        {
-            "id": result.id,
-            "score": result.score,
-            "payload": result.payload
-        }
-        for result in results
-    ]
\ No newline at end of file
+        [_to_result_dict(point) for point in response.points]
+        for response in responses
+    ]
+
+def _to_result_dict(result) -> dict:
+    return {
+        "id": result.id,
+        "score": result.score,
+        "payload": result.payload
+    }
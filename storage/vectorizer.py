@@ -1,11 +1,52 @@
-from sentence_transformers import SentenceTransformer
+from concurrent.futures import ThreadPoolExecutor
 from qdrant_client import models
 from configs.configs import configs
+from storage.embedding_cache import EmbeddingCache
+from storage.embedding_pool import EmbeddingWorkerPool
+from monitoring import metrics
+from typing import TYPE_CHECKING
+import asyncio
+import numpy as np
+import threading
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx_int8")
+
+def load_model(model_name: str, backend: str = "torch", threads: int | None = None) -> "SentenceTransformer":
+    """
+        Load the sentence transformer with the given inference backend.
+        `onnx` and `onnx_int8` need `optimum[onnxruntime]`; `onnx_int8` loads the
+        dynamically quantized export named by EMBEDDING_ONNX_INT8_FILE.
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {EMBEDDING_BACKENDS}")
+    # imported here, torch alone takes seconds and importing this module should stay cheap
+    import torch
+    from sentence_transformers import SentenceTransformer
+    if threads:
+        torch.set_num_threads(threads)
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+
+    import onnxruntime
+    session_options = onnxruntime.SessionOptions()
+    if threads:
+        session_options.intra_op_num_threads = threads
+    model_kwargs = {"provider": "CPUExecutionProvider", "session_options": session_options}
+    if backend == "onnx_int8":
+        model_kwargs["file_name"] = configs.get_embedding_onnx_int8_file()
+    return SentenceTransformer(model_name, backend="onnx", model_kwargs=model_kwargs)
     
 class Vectorizer:
     _instance = None
     _initialized = False
-    model: SentenceTransformer
+    _lock = threading.Lock()
+    model: "SentenceTransformer | None" # None when the worker processes encode
+    executor: ThreadPoolExecutor
+    cache: EmbeddingCache | None
+    pool: EmbeddingWorkerPool | None
 
     def __new__(cls):
         if cls._instance is None:
@@ -15,20 +56,119 @@ class Vectorizer:
     def __init__(self):
         if not self._initialized:
             model_name = configs.get_embedding_model_name()
-            self.model = SentenceTransformer(model_name)
+            backend = configs.get_embedding_backend()
+            self.model = None
+            self.pool = None
+            if configs.get_embedding_worker_processes() > 0:
+                self.pool = EmbeddingWorkerPool(
+                    worker_count=configs.get_embedding_worker_processes(),
+                    model_name=model_name,
+                    backend=backend,
+                    threads_per_worker=configs.get_embedding_threads(),
+                    share_weights=configs.is_embedding_worker_weight_sharing_enabled()
+                )
+            else:
+                self.model = load_model(model_name, backend, configs.get_embedding_threads())
+            # bounded pool so CPU-bound encodes never run on the event loop
+            self.executor = ThreadPoolExecutor(
+                max_workers=configs.get_embedding_pool_size(),
+                thread_name_prefix="embedding"
+            )
+            self.cache = None
+            if configs.get_embedding_cache_size() > 0:
+                # backends drift slightly, so their embeddings are cached separately
+                self.cache = EmbeddingCache(
+                    model_name=f"{model_name}:{backend}",
+                    max_size=configs.get_embedding_cache_size(),
+                    ttl_seconds=configs.get_embedding_cache_ttl_seconds(),
+                    disk_path=configs.get_embedding_cache_path(),
+                    disk_max_rows=configs.get_embedding_cache_max_rows()
+                )
             self._initialized = True
 
     def get_vector_config(self):
         return models.VectorParams(
-            size=self.model.get_sentence_embedding_dimension(), # type: ignore 
+            size=self.get_dimension(),
             distance=models.Distance.COSINE)
 
+    def get_dimension(self) -> int:
+        if self.pool is not None:
+            return self.pool.get_dimension()
+        return self.model.get_sentence_embedding_dimension() # type: ignore
+
     def generate_embedding(self, text: str):
-        return self.model.encode(text).tolist()
+        return self.generate_embeddings([text])[0]
+
+    def generate_embeddings(self, texts: list[str], batch_size: int | None = None) -> list[list[float]]:
+        """
+            Encode many texts with as few forward passes as possible.
+
+            Texts are sorted by length and split into buckets of `batch_size` so that
+            each forward pass pads to similar lengths. Embeddings are returned in the
+            same order as `texts`. Cached texts and duplicates are only encoded once.
+        """
+        if len(texts) == 0:
+            return []
+        if self.cache is None:
+            return self.generate_embeddings_array(texts, batch_size).tolist()
+
+        # the cache holds float32 arrays, qdrant points need plain lists
+        embeddings = self.cache.get_many(texts)
+        missing_texts = list(dict.fromkeys(
+            text for text, embedding in zip(texts, embeddings) if embedding is None
+        ))
+        if len(missing_texts) > 0:
+            computed = self.generate_embeddings_array(missing_texts, batch_size)
+            self.cache.set_many(missing_texts, computed)
+            computed_by_text = dict(zip(missing_texts, computed))
+            embeddings = [
+                computed_by_text[text] if embedding is None else embedding
+                for text, embedding in zip(texts, embeddings)
+            ]
+        return [embedding.tolist() for embedding in embeddings] # type: ignore
+
+    def get_cache_stats(self) -> dict:
+        return {} if self.cache is None else self.cache.get_stats()
+
+    def generate_embeddings_array(self, texts: list[str], batch_size: int | None = None) -> np.ndarray:
+        """
+            Embeddings as a float32 array in the order of `texts`, bypassing the cache.
+            Uses the worker processes when EMBEDDING_WORKER_PROCESSES is set.
+        """
+        batch_size = batch_size or configs.get_embedding_batch_size()
+        metrics.ENCODE_BATCH_SIZE.observe(len(texts))
+        with metrics.STAGE_SECONDS.labels("encode").time():
+            if self.pool is not None:
+                return self.pool.encode(texts, batch_size)
+            return self.__encode_in_process(texts, batch_size)
+
+    def __encode_in_process(self, texts: list[str], batch_size: int) -> np.ndarray:
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        dimension = self.get_dimension()
+        embeddings = np.empty((len(texts), dimension), dtype=np.float32)
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            embeddings[bucket] = self.model.encode([texts[i] for i in bucket], batch_size=batch_size) # type: ignore
+        return embeddings
+
+    async def generate_embeddings_async(self, texts: list[str], batch_size: int | None = None) -> list[list[float]]:
+        """Run generate_embeddings on the embedding executor"""
+        if len(texts) == 0:
+            return []
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.generate_embeddings, texts, batch_size)
     
     @classmethod
     def get_instance(cls):
-        """Get the singleton instance of Vectorizer"""
-        if cls._instance is None:
-            cls._instance = cls()
+        """Get the singleton instance of Vectorizer, loading the model on first use"""
+        if cls.is_ready():
+            return cls._instance
+        # the model may be loading in a startup thread; wait for it instead of loading twice
+        with cls._lock:
+            if not cls.is_ready():
+                cls._instance = cls()
         return cls._instance
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        return cls._instance is not None and cls._instance._initialized
@@ -0,0 +1,52 @@
+import numpy as np
+from storage.local_store import LocalCollection
+from storage.vector_store import build_filter
+
+PAYLOAD_INDEXES = {"company_slug": "keyword", "source": "keyword", "hop_level": "integer", "job_id": "keyword"}
+
+def make_collection(count: int = 20) -> LocalCollection:
+    collection = LocalCollection({"skills": 8}, payload_indexes=PAYLOAD_INDEXES)
+    rng = np.random.default_rng(7)
+    collection.upsert(
+        [f"point-{i}" for i in range(count)],
+        {"skills": rng.random((count, 8), dtype=np.float32)},
+        [
+            {"job_id": f"job-{i}", "titles": [f"title {i % 3}"], "source": ["human", "taxonomy"][i % 2],
+             "company_slug": f"company-{i % 4}", "hop_level": i % 3}
+            for i in range(count)
+        ]
+    )
+    return collection
+
+def test_snapshot_load_round_trip(tmp_path):
+    collection = make_collection()
+    collection.snapshot(str(tmp_path))
+
+    loaded = LocalCollection.load(str(tmp_path), PAYLOAD_INDEXES)
+
+    assert loaded.ids == collection.ids
+    assert [loaded.get_payload(row) for row in range(loaded.size)] == [collection.get_payload(row) for row in range(collection.size)]
+    np.testing.assert_array_equal(np.asarray(loaded.vectors["skills"]), collection.vectors["skills"][:collection.size])
+    query_filter = build_filter(sources=["human"], max_hop_level=1, exclude_company_slugs=["company-0"])
+    np.testing.assert_array_equal(loaded.filter_mask(query_filter), collection.filter_mask(query_filter))
+
+def test_loaded_collection_accepts_writes(tmp_path):
+    make_collection().snapshot(str(tmp_path))
+    loaded = LocalCollection.load(str(tmp_path), PAYLOAD_INDEXES)
+
+    loaded.set_payload(0, {"source": "taxonomy", "hop_level": 2})
+    loaded.upsert(["point-new"], {"skills": np.ones((1, 8), dtype=np.float32)}, [{"job_id": "job-new", "source": "human", "hop_level": 0}])
+
+    assert loaded.get_payload(0)["source"] == "taxonomy"
+    assert loaded.filter_mask(build_filter(sources=["human"], max_hop_level=0))[-1]
+
+def test_snapshot_over_its_own_memory_map(tmp_path):
+    collection = make_collection()
+    collection.snapshot(str(tmp_path))
+    loaded = LocalCollection.load(str(tmp_path), PAYLOAD_INDEXES)
+
+    # nothing was written, so the vectors are still mapped from the files being replaced
+    loaded.snapshot(str(tmp_path))
+
+    reloaded = LocalCollection.load(str(tmp_path), PAYLOAD_INDEXES)
+    np.testing.assert_array_equal(np.asarray(reloaded.vectors["skills"]), collection.vectors["skills"][:collection.size])